@@ -1,55 +1,121 @@
-from sqlalchemy import text
-from sqlalchemy.exc import OperationalError
-from sqlmodel import SQLModel
-from typer import Typer
-
-from budy.budgets import app as budgets_app
-from budy.categories import app as categories_app
-from budy.database import engine
-from budy.reports import app as reports_app
-from budy.setup import run_setup
-from budy.transactions import app as transactions_app
-
-
-def _run_migrations():
-    """Simple migration logic to add columns if they are missing."""
-    try:
-        with engine.connect() as conn:
-            # Check for category_id in transaction table
-            try:
-                conn.execute(text("SELECT category_id FROM 'transaction' LIMIT 1"))
-            except OperationalError as e:
-                # Check if it's a missing column error
-                if "no such column" in str(e).lower():
-                    conn.execute(
-                        text(
-                            "ALTER TABLE 'transaction' ADD COLUMN category_id INTEGER REFERENCES category(id)"
-                        )
-                    )
-                    conn.commit()
-    except Exception:
-        # If DB file doesn't exist or other issues, let create_all handle it
-        pass
-
-
-_run_migrations()
-SQLModel.metadata.create_all(engine)
-
-app = Typer(no_args_is_help=True)
-
-app.add_typer(transactions_app, name="transactions")
-app.add_typer(budgets_app, name="budgets")
-app.add_typer(categories_app, name="categories")
-app.add_typer(reports_app, name="reports")
-
-app.command(name="setup")(run_setup)
+from difflib import get_close_matches
+from importlib import import_module
+
+import click
+from typer import Context, Typer
+from typer.core import TyperGroup
+
+# Sub-commands are registered by import path and only imported when dispatched,
+# so `budy --help` and friends never pay for polars, sqlmodel or the database.
+# The help text is duplicated here to render the top-level help without imports.
+LAZY_COMMANDS: dict[str, tuple[str, str]] = {
+    "transactions": ("budy.transactions:app", "Manage transaction history."),
+    "budgets": ("budy.budgets:app", "Set and manage monthly targets."),
+    "categories": ("budy.categories:app", "Manage transaction categories."),
+    "reports": ("budy.reports:app", "View financial insights."),
+    "db": ("budy.db:app", "Maintain the budy database."),
+    "serve": (
+        "budy.daemon:run_serve",
+        "Keep budy warm in the background and serve commands over a Unix socket.",
+    ),
+    "setup": (
+        "budy.setup:run_setup",
+        "Initialize the configuration file with your details.",
+    ),
+}
+
+_loaded_commands: dict[str, click.Command] = {}
+
+
+def _load_command(name: str) -> click.Command:
+    """Imports a registered sub-command and converts it to a click command."""
+    if name not in _loaded_commands:
+        import typer.main
+
+        module_path, attr = LAZY_COMMANDS[name][0].split(":")
+        target = getattr(import_module(module_path), attr)
+
+        if isinstance(target, Typer):
+            command: click.Command = typer.main.get_group(target)
+        else:
+            # Plain functions are wrapped in a single-command Typer app.
+            wrapper = Typer(add_completion=False)
+            wrapper.command(name=name)(target)
+            command = typer.main.get_command(wrapper)
+
+        command.name = name
+        _loaded_commands[name] = command
+
+    return _loaded_commands[name]
+
+
+class LazyGroup(TyperGroup):
+    """Typer group that resolves registered sub-commands on first use."""
+
+    _listing_help = False
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [*super().list_commands(ctx), *LAZY_COMMANDS]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in LAZY_COMMANDS:
+            return super().get_command(ctx, cmd_name)
+
+        if self._listing_help:
+            # Rendering the command list only needs names and help text.
+            return click.Command(name=cmd_name, help=LAZY_COMMANDS[cmd_name][1])
+
+        return _load_command(cmd_name)
+
+    def resolve_command(
+        self, ctx: click.Context, args: list[str]
+    ) -> tuple[str | None, click.Command | None, list[str]]:
+        try:
+            return super().resolve_command(ctx, args)
+        except click.UsageError as e:
+            # Typer only suggests from eagerly registered commands.
+            matches = get_close_matches(args[0], LAZY_COMMANDS) if args else []
+            if matches and "Did you mean" not in e.message:
+                suggestions = ", ".join(f"{m!r}" for m in matches)
+                e.message = f"{e.message.rstrip('.')}. Did you mean {suggestions}?"
+            raise
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        self._listing_help = True
+        try:
+            return super().format_help(ctx, formatter)
+        finally:
+            self._listing_help = False
+
+
+app = Typer(cls=LazyGroup, no_args_is_help=True)
 
 
 @app.callback()
-def callback():
+def callback(ctx: Context):
     """An itsy bitsy CLI budgeting assistant."""
-    ...
+    # `budy db` initializes the database in its own callback, except for
+    # `db migrate`; `budy serve` initializes it itself before warming up.
+    if ctx.invoked_subcommand in ("db", "serve"):
+        return
+
+    from budy.database import init_db
+
+    init_db()
+
+
+def main():
+    """Console entry point: forwards to a running `budy serve` daemon if possible."""
+    import sys
+
+    from budy.client import forward
+
+    code = forward(sys.argv[1:])
+    if code is None:
+        app()
+    else:
+        sys.exit(code)
 
 
 if __name__ == "__main__":
-    app()
+    main()
@@ -1,4 +1,5 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
 from rich.console import Console
 from sqlmodel import Session
@@ -6,6 +7,7 @@ from typer import Argument, Exit, Option, Typer, confirm
 
 from budy.database import engine
 from budy.services.category import (
+    apply_rules,
     create_category,
     create_rule,
     delete_category,
@@ -13,7 +15,11 @@ from budy.services.category import (
     get_categories,
     get_rules,
 )
-from budy.views.category import render_category_list, render_rule_list
+from budy.views.category import (
+    render_category_list,
+    render_rule_apply_summary,
+    render_rule_list,
+)
 from budy.views.messages import render_error, render_success, render_warning
 
 app = Typer(no_args_is_help=True)
@@ -154,3 +160,47 @@ def delete_rule_cmd(
         raise Exit(1)
 
     console.print(render_success(message=f"Deleted rule [bold]#{rule_id}[/]"))
+
+
+@rules_app.command(name="apply")
+def apply_rules_cmd(
+    overwrite: Annotated[
+        bool,
+        Option(
+            "--all/--uncategorized",
+            help="Re-categorize every matching transaction, "
+            "or only uncategorized ones.",
+        ),
+    ] = False,
+    since: Annotated[
+        Optional[datetime],
+        Option(
+            "--since",
+            "-s",
+            help="Only transactions dated on or after this day.",
+            formats=["%Y-%m-%d", "%Y/%m/%d"],
+        ),
+    ] = None,
+    only_new: Annotated[
+        bool,
+        Option("--new", help="Only transactions added since the last apply."),
+    ] = False,
+):
+    """Apply the rules to transactions that are already stored."""
+    with Session(engine) as session:
+        summary = apply_rules(
+            session=session,
+            overwrite=overwrite,
+            since=since.date() if since else None,
+            only_new=only_new,
+        )
+
+    if not summary.changed:
+        console.print(
+            render_warning(
+                message=f"No changes; {summary.scanned} transactions scanned."
+            )
+        )
+        return
+
+    console.print(render_rule_apply_summary(summary=summary))
@@ -0,0 +1,112 @@
+import json
+import os
+import socket
+import struct
+import sys
+from pathlib import Path
+
+from typer import get_app_dir
+
+# Kept free of heavy imports: this module runs before every forwarded command.
+# "budy" matches config.APP_NAME, which is not imported to avoid loading settings.
+APP_DIR_NAME = "budy"
+
+# Commands that always run in-process (they are interactive, start the daemon
+# or run until stopped, which would hold up the daemon's one-at-a-time queue).
+LOCAL_COMMANDS = {"serve", "setup", "transactions watch"}
+
+# Frames are a one-byte kind, a four-byte big-endian length and the payload.
+FRAME_HEADER = struct.Struct(">cI")
+STDOUT = b"o"
+STDERR = b"e"
+EXIT = b"x"
+REFUSED = b"r"
+
+
+def socket_path() -> Path:
+    """Returns the Unix socket path used by `budy serve`."""
+    override = os.getenv("BUDY_SOCKET")
+    if override:
+        return Path(override)
+    return Path(get_app_dir(APP_DIR_NAME)) / "budy.sock"
+
+
+def write_frame(sock: socket.socket, kind: bytes, payload: bytes = b"") -> None:
+    """Sends a single frame over the socket."""
+    sock.sendall(FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Daemon closed the connection.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def read_frame(sock: socket.socket) -> tuple[bytes, bytes]:
+    """Reads a single frame from the socket."""
+    kind, length = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+    return kind, _recv_exact(sock, length)
+
+
+def _reads_stdin(argv: list[str]) -> bool:
+    """Whether a command reads its input from stdin, which the daemon cannot see."""
+    return any(arg in ("-", "--file=-", "-f-") for arg in argv)
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Runs a command on the `budy serve` daemon and streams back its output.
+    Returns the exit code, or None if the command should run in-process.
+    """
+    if not hasattr(socket, "AF_UNIX") or os.getenv("BUDY_NO_DAEMON"):
+        return None
+    if argv and (argv[0] in LOCAL_COMMANDS or " ".join(argv[:2]) in LOCAL_COMMANDS):
+        return None
+    if _reads_stdin(argv):
+        return None
+
+    path = socket_path()
+    if not path.exists():
+        return None
+
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "db_url": os.getenv("BUDY_DB_URL"),
+    }
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(path))
+    except OSError:
+        # Stale socket file or daemon not accepting connections.
+        return None
+
+    with sock:
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+        except OSError:
+            # The daemon went away before it could have seen the command.
+            return None
+
+        while True:
+            try:
+                kind, payload = read_frame(sock)
+            except OSError as e:
+                # The command may have run in part, so it is not retried in-process.
+                sys.stderr.write(f"Lost the connection to the budy daemon: {e}\n")
+                return 1
+            if kind == STDOUT:
+                sys.stdout.buffer.write(payload)
+                sys.stdout.buffer.flush()
+            elif kind == STDERR:
+                sys.stderr.buffer.write(payload)
+                sys.stderr.buffer.flush()
+            elif kind == EXIT:
+                return int(payload)
+            elif kind == REFUSED:
+                return None
@@ -1,8 +1,8 @@
 import tomllib
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typer import get_app_dir
 
 APP_NAME = "budy"
@@ -11,15 +11,80 @@ APP_NAME = "budy"
 class BankConfig(BaseModel):
     """Configuration for a specific bank's transaction file import."""
 
+    # "csv" exports use the settings below; camt.053 XML takes none of them, as the
+    # standard fixes its encoding, amount and date formats and its fields.
+    format: Literal["csv", "camt053"] = "csv"
     delimiter: str = ","
     decimal: str = "."
+    # Digit group separator in amounts, e.g. "." in "1.234,56"; spaces are always ignored.
+    thousands: Optional[str] = None
     encoding: str = "utf-8"
-    date_col: str
-    amount_col: str
-    debit_credit_col: str
+    date_col: Optional[str] = None
+    amount_col: Optional[str] = None
+    debit_credit_col: Optional[str] = None
     debit_value: str = "D"
     receiver_col: Optional[str] = None
     description_col: Optional[str] = None
+    # Unique archive/reference ID column; re-imported rows with a known ID are skipped.
+    reference_col: Optional[str] = None
+    # strftime format of the date column, e.g. "%d.%m.%Y"; guessed per value if unset.
+    date_format: Optional[str] = None
+    # Polars dtype names overriding a column's type, e.g. {"Kuupäev" = "Date"}.
+    dtypes: dict[str, str] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_format_settings(self):
+        if self.format == "camt053":
+            extra = [
+                name
+                for name, field in type(self).model_fields.items()
+                if name != "format"
+                and getattr(self, name) != field.get_default(call_default_factory=True)
+            ]
+            if extra:
+                raise ValueError(
+                    f"camt053 banks take no other settings: {', '.join(extra)}"
+                )
+        elif not (self.date_col and self.amount_col and self.debit_credit_col):
+            raise ValueError(
+                "date_col, amount_col and debit_credit_col are required for CSV banks"
+            )
+        return self
+
+
+class DatabaseConfig(BaseModel):
+    """SQLite performance settings, applied as pragmas to every new connection."""
+
+    journal_mode: Literal["delete", "truncate", "persist", "memory", "wal", "off"] = (
+        "wal"
+    )
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    # Negative values are in KiB (64 MiB), positive values are pages.
+    cache_size: int = -64000
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: Literal["default", "file", "memory"] = "memory"
+    busy_timeout: int = 5000
+
+
+class ImportConfig(BaseModel):
+    """Settings for writing imported transactions to the database."""
+
+    # Statement rows parsed and committed at a time; bounds memory on huge files.
+    batch_size: int = Field(default=50_000, gt=0)
+    # Rows per INSERT batch; larger batches mean fewer round trips but more memory.
+    chunk_size: int = Field(default=5000, gt=0)
+    # Processes parsing statements when importing several files; 0 means one per CPU.
+    workers: int = Field(default=0, ge=0)
+
+
+class IdentityConfig(BaseModel):
+    """Who else counts as "you": transfers to these are treated as self-transfers."""
+
+    # Other names you appear under on statements (e.g. a maiden name).
+    aliases: list[str] = Field(default_factory=list)
+    household: list[str] = Field(default_factory=list)
+    # Account numbers, matched against receivers that show an account instead of a name.
+    ibans: list[str] = Field(default_factory=list)
 
 
 class Settings(BaseModel):
@@ -31,6 +96,9 @@ class Settings(BaseModel):
     max_year: int = 2100
     first_name: str | None = None
     last_name: str | None = None
+    identity: IdentityConfig = Field(default_factory=IdentityConfig)
+    imports: ImportConfig = Field(default_factory=ImportConfig)
+    database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     # Default configurations for major Estonian banks.
     # These column headers match the standard CSV export format for these banks.
     banks: dict[str, BankConfig] = Field(
@@ -62,9 +130,21 @@ class Settings(BaseModel):
                 receiver_col="Saaja/Maksja",
                 description_col="Selgitus",
             ),
+            # ISO 20022 XML statements, offered by all of the banks above.
+            "camt053": BankConfig(format="camt053"),
         }
     )
 
+    @model_validator(mode="after")
+    def check_camt_banks(self):
+        # camt.053 statements carry nothing that tells their banks apart.
+        camt = sorted(n for n, b in self.banks.items() if b.format == "camt053")
+        if len(camt) > 1:
+            raise ValueError(
+                f"Only one camt053 bank can be configured, found: {', '.join(camt)}"
+            )
+        return self
+
     @classmethod
     def load(cls):
         """Loads settings from defaults and overrides from the config file."""
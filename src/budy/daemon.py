@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from importlib import import_module
+from pathlib import Path
+from typing import Annotated, Optional
+
+from rich.console import Console
+from typer import Exit, Option, get_app_dir
+
+from budy.client import (
+    EXIT,
+    REFUSED,
+    STDERR,
+    STDOUT,
+    socket_path,
+    write_frame,
+)
+from budy.config import APP_NAME, Settings, settings
+from budy.views.messages import render_error, render_success
+
+console = Console()
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream that forwards everything written to it as socket frames."""
+
+    def __init__(self, sock: socket.socket, kind: bytes):
+        self._sock = sock
+        self._kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if s:
+            write_frame(self._sock, self._kind, s.encode())
+        return len(s)
+
+
+class _ConfigWatcher:
+    """Reloads the shared settings object in place when config.toml changes."""
+
+    def __init__(self):
+        self.path = Path(get_app_dir(APP_NAME)) / "config.toml"
+        self.mtime = self._current_mtime()
+
+    def _current_mtime(self) -> float | None:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def refresh(self) -> None:
+        mtime = self._current_mtime()
+        if mtime == self.mtime:
+            return
+
+        fresh = Settings.load()
+        for field in Settings.model_fields:
+            setattr(settings, field, getattr(fresh, field))
+        self.mtime = mtime
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "BudyServer"
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+
+        # The daemon only serves clients pointing at the same database.
+        if request.get("db_url") != os.getenv("BUDY_DB_URL"):
+            write_frame(self.connection, REFUSED)
+            return
+
+        code = self.server.run(
+            argv=request["argv"],
+            cwd=request["cwd"],
+            stdout=_FrameWriter(self.connection, STDOUT),
+            stderr=_FrameWriter(self.connection, STDERR),
+        )
+        write_frame(self.connection, EXIT, str(code).encode())
+
+
+class BudyServer(socketserver.UnixStreamServer):
+    """
+    Serves budy commands over a Unix socket from a warm process.
+    Requests are handled one at a time, as commands write to the process-wide stdout.
+    """
+
+    def __init__(self, path: Path):
+        from typer.main import get_command
+
+        from budy import LAZY_COMMANDS, app
+        from budy.client import LOCAL_COMMANDS
+        from budy.database import init_db
+
+        # Warm up: import every sub-command and its dependencies, open the database.
+        # Module-level consoles detect the terminal when created, so import them
+        # against a plain buffer to keep forwarded output free of colour codes.
+        init_db()
+        with redirect_stdout(io.StringIO()):
+            for name in LAZY_COMMANDS.keys() - LOCAL_COMMANDS:
+                import_module(LAZY_COMMANDS[name][0].split(":")[0])
+
+        self.command = get_command(app)
+        self.config = _ConfigWatcher()
+        super().__init__(str(path), _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def run(self, *, argv: list[str], cwd: str, stdout, stderr) -> int:
+        """Runs a single command as if invoked from the client's shell."""
+        self.config.refresh()
+        previous_cwd, previous_stdin = os.getcwd(), sys.stdin
+
+        try:
+            os.chdir(cwd)
+            # Prompts cannot be answered remotely; they abort instead of blocking.
+            sys.stdin = io.StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                try:
+                    self.command.main(args=argv, prog_name="budy")
+                except SystemExit as e:
+                    return e.code if isinstance(e.code, int) else int(bool(e.code))
+                except Exception:
+                    traceback.print_exc()
+                    return 1
+        finally:
+            os.chdir(previous_cwd)
+            sys.stdin = previous_stdin
+
+        return 0
+
+
+def _handle_sigterm(signum, frame):
+    raise SystemExit(0)
+
+
+def _claim_socket(path: Path) -> None:
+    """Removes a stale socket file, refusing to replace a live daemon."""
+    if not path.exists():
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink()
+        return
+    finally:
+        probe.close()
+
+    raise RuntimeError(f"A budy daemon is already listening on {path}.")
+
+
+def run_serve(
+    socket_file: Annotated[
+        Optional[Path],
+        Option(
+            "--socket",
+            "-s",
+            help="Path of the Unix socket to listen on.",
+        ),
+    ] = None,
+) -> None:
+    """Keep budy warm in the background and serve commands over a Unix socket."""
+    if not hasattr(socket, "AF_UNIX"):
+        console.print(render_error(message="Unix sockets are not supported here."))
+        raise Exit(1)
+
+    path = socket_file or socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        _claim_socket(path)
+    except RuntimeError as e:
+        console.print(render_error(message=str(e)))
+        raise Exit(1)
+
+    # Turn SIGTERM into a normal shutdown so the socket file is cleaned up.
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    server = None
+
+    try:
+        server = BudyServer(path)
+        console.print(render_success(message=f"Serving budy on {path}"))
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.server_close()
+        path.unlink(missing_ok=True)
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from sqlalchemy import Connection, event
 from sqlmodel import create_engine
 from typer import get_app_dir
 
@@ -23,3 +24,51 @@ if ":memory:" in target_db_url:
     pool_class = StaticPool
 
 engine = create_engine(target_db_url, connect_args=connect_args, poolclass=pool_class)
+
+# Order matters: the busy timeout must be in place before switching journal modes.
+SQLITE_PRAGMAS = (
+    "busy_timeout",
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+)
+
+
+@event.listens_for(engine, "connect")
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Applies the configured SQLite performance profile to each new connection."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma} = {getattr(settings.database, pragma)}")
+    cursor.close()
+
+
+def begin_write(connection: Connection) -> None:
+    """
+    Opens the write transaction explicitly. The SQLite driver only begins one
+    before DML, so DDL such as dropping a trigger would otherwise be committed
+    on its own and survive a failure of the statements after it.
+    """
+    dbapi_connection = connection.connection.dbapi_connection
+    if not getattr(dbapi_connection, "in_transaction", True):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+_initialized = False
+
+
+def init_db():
+    """Brings the database schema up to date once per process."""
+    global _initialized
+    if _initialized:
+        return
+
+    from budy.migrations import migrate
+
+    migrate(engine)
+    _initialized = True
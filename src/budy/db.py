@@ -0,0 +1,97 @@
+from rich.console import Console
+from sqlmodel import Session
+from typer import Context, Exit, Typer
+
+from budy.database import engine, init_db
+from budy.migrations import SCHEMA_VERSION, migrate
+from budy.services.db import get_pragmas
+from budy.services.report import rebuild_monthly_summaries
+from budy.services.transaction import (
+    rebuild_search_index,
+    recompute_self_transfers,
+)
+from budy.views.db import render_pragma_list
+from budy.views.messages import render_error, render_success
+
+app = Typer(no_args_is_help=True)
+console = Console()
+
+
+@app.command(name="migrate")
+def run_migrate() -> None:
+    """Apply pending schema migrations."""
+    try:
+        applied = migrate(engine)
+    except Exception as e:
+        console.print(render_error(message=f"Migration failed: {e}"))
+        raise Exit(1)
+
+    if not applied:
+        console.print(
+            render_success(message=f"Schema is up to date (version {SCHEMA_VERSION}).")
+        )
+        return
+
+    console.print(
+        render_success(
+            message=f"Applied {applied} migration(s). Schema is at version {SCHEMA_VERSION}."
+        )
+    )
+
+
+@app.command(name="pragmas")
+def show_pragmas() -> None:
+    """Show the configured and effective SQLite pragmas."""
+    with Session(engine) as session:
+        pragmas = get_pragmas(session=session)
+
+    console.print(render_pragma_list(pragmas=pragmas))
+
+
+@app.command(name="rebuild-search")
+def run_rebuild_search() -> None:
+    """Rebuild the full-text search index from stored transactions."""
+    with Session(engine) as session:
+        count = rebuild_search_index(session=session)
+
+    console.print(
+        render_success(
+            message=f"Rebuilt search index for [bold]{count}[/] transactions."
+        )
+    )
+
+
+@app.command(name="rebuild-summaries")
+def run_rebuild_summaries() -> None:
+    """Recompute the monthly summary table from stored transactions."""
+    with Session(engine) as session:
+        count = rebuild_monthly_summaries(session=session)
+
+    console.print(
+        render_success(message=f"Rebuilt [bold]{count}[/] monthly summary rows.")
+    )
+
+
+@app.command(name="recompute-self-transfers")
+def run_recompute_self_transfers() -> None:
+    """Re-flag transfers to your own accounts using the configured name."""
+    with Session(engine) as session:
+        count = recompute_self_transfers(session=session)
+
+    console.print(
+        render_success(
+            message=f"Flagged [bold]{count}[/] transactions as self-transfers."
+        )
+    )
+
+
+@app.callback()
+def callback(ctx: Context):
+    """Maintain the budy database."""
+    # `db migrate` applies the migrations itself and reports what it changed.
+    if ctx.invoked_subcommand != "migrate":
+        init_db()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,204 @@
+import json
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Connection
+
+from budy.config import settings
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+def get_name_variants(name: str) -> set[str]:
+    """Generates variants of a name (lowercase, initials, mixed forms)."""
+    clean_name = name.strip().lower()
+    parts = clean_name.split()
+
+    if not parts:
+        return {clean_name}
+
+    # Banks often format names inconsistently in statement descriptions (e.g., "J. Smith" vs "J.Smith" vs "J Smith").
+    # We generate all common variations to ensure we can identify the user regardless of how the bank formatted the receiver field.
+    variants = {clean_name}
+
+    # 1. All Initials (e.g. "khl", "k.h.l.", "k. h. l.")
+    initials_chars = [p[0] for p in parts]
+    variants.add("".join(initials_chars))
+    variants.add(".".join(initials_chars) + ".")
+    variants.add(". ".join(initials_chars) + ".")
+
+    if len(parts) > 1:
+        last_name = parts[-1]
+        first_names = parts[:-1]
+        first_initials_chars = [p[0] for p in first_names]
+
+        # 2. First name initial + Last name full (e.g. "k laurits", "k. laurits")
+        first_initial = first_names[0][0]
+        variants.add(f"{first_initial} {last_name}")
+        variants.add(f"{first_initial}. {last_name}")
+        variants.add(f"{first_initial}.{last_name}")
+
+        # 3. All first names initialed + Last name full (e.g. "k. h. laurits")
+        if len(first_names) > 1:
+            # "kh laurits"
+            variants.add(f"{''.join(first_initials_chars)} {last_name}")
+            # "k. h. laurits"
+            dotted_spaced = ". ".join(first_initials_chars) + "."
+            variants.add(f"{dotted_spaced} {last_name}")
+            # "k.h. laurits"
+            dotted_tight = ".".join(first_initials_chars) + "."
+            variants.add(f"{dotted_tight} {last_name}")
+
+    return variants
+
+
+# Characters with a special meaning in both Python and polars (Rust) regexes.
+_REGEX_SPECIAL = set(".^$*+?()[]{}|\\")
+
+_WORD = r"\S*"
+_SEP = r"\s+"
+
+
+def _escape(text: str) -> str:
+    return "".join(f"\\{c}" if c in _REGEX_SPECIAL else c for c in text)
+
+
+def _initials_pattern(initials: list[str]) -> str:
+    """Matches names whose words start with the given initials, in order."""
+    return _SEP.join(_escape(c) + _WORD for c in initials)
+
+
+def _reverse_patterns(full_name: str) -> list[str]:
+    """
+    Builds regexes for receivers whose name variants include `full_name`.
+    This is the inverse of get_name_variants, e.g. an owner configured as
+    "J. Doe" matches a receiver "Jane Doe", without generating variants per row.
+    """
+    patterns = []
+    words = full_name.split()
+
+    # All initials: "jd", "j.d.", "j. d."
+    if len(words) == 1 and len(full_name) > 1:
+        tight = full_name.rstrip(".").split(".")
+        if full_name.endswith(".") and all(len(c) == 1 for c in tight):
+            patterns.append(_initials_pattern(tight))
+        patterns.append(_initials_pattern(list(full_name)))
+    if len(words) > 1 and all(len(w) == 2 and w.endswith(".") for w in words):
+        patterns.append(_initials_pattern([w[0] for w in words]))
+
+    # First name initial + last name: "j doe", "j. doe", "j.doe"
+    if len(words) == 2 and words[0] in (words[0][0], words[0][0] + "."):
+        last = _escape(words[1])
+        patterns.append(f"{_escape(words[0][0])}{_WORD}{_SEP}(\\S+{_SEP})*{last}")
+    if len(words) == 1 and len(full_name) > 2 and full_name[1] == ".":
+        last = _escape(full_name[2:])
+        patterns.append(f"{_escape(full_name[0])}{_WORD}{_SEP}(\\S+{_SEP})*{last}")
+
+    # All first names initialed + last name: "jm doe", "j. m. doe", "j.m. doe"
+    if len(words) > 2 and all(len(w) == 2 and w.endswith(".") for w in words[:-1]):
+        initials = [w[0] for w in words[:-1]]
+        patterns.append(f"{_initials_pattern(initials)}{_SEP}{_escape(words[-1])}")
+    if len(words) == 2:
+        first, last = words
+        tight = first.rstrip(".").split(".")
+        if first.endswith(".") and len(tight) > 1 and all(len(c) == 1 for c in tight):
+            patterns.append(f"{_initials_pattern(tight)}{_SEP}{_escape(last)}")
+        elif "." not in first and len(first) > 1:
+            patterns.append(f"{_initials_pattern(list(first))}{_SEP}{_escape(last)}")
+
+    return patterns
+
+
+class OwnerMatcher:
+    """
+    Recognizes receivers that are the user, a household member or one of
+    their accounts. Built once per configuration; see get_owner_matcher.
+    """
+
+    def __init__(self, names: list[str], ibans: list[str]):
+        self.variants: set[str] = set()
+        patterns: list[str] = []
+        for name in names:
+            if name.strip():
+                self.variants |= get_name_variants(name)
+                patterns += _reverse_patterns(name.strip().lower())
+
+        self.pattern = "|".join(f"^(?:{p})$" for p in patterns)
+        self._regex = re.compile(self.pattern) if self.pattern else None
+        self.ibans = {_normalize_iban(iban) for iban in ibans if iban.strip()}
+
+        # Ledgers repeat the same few receivers, so remember every answer.
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def _match(self, receiver: str | None) -> bool:
+        if not receiver:
+            return False
+
+        receiver_clean = receiver.strip().lower()
+        if receiver_clean in self.variants:
+            return True
+        if self._regex and self._regex.match(receiver_clean):
+            return True
+        return _normalize_iban(receiver) in self.ibans
+
+    def expr(self, receiver: "pl.Expr") -> "pl.Expr":
+        """Polars expression flagging a whole receiver column in one pass."""
+        clean = receiver.str.strip_chars().str.to_lowercase()
+        flag = clean.is_in(list(self.variants))
+        if self.pattern:
+            flag = flag | clean.str.contains(self.pattern)
+        if self.ibans:
+            iban = receiver.str.replace_all(r"\s", "").str.to_uppercase()
+            flag = flag | iban.is_in(list(self.ibans))
+        return flag.fill_null(False)
+
+
+def _normalize_iban(value: str) -> str:
+    return "".join(value.split()).upper()
+
+
+@lru_cache(maxsize=4)
+def _build_matcher(names: tuple[str, ...], ibans: tuple[str, ...]) -> OwnerMatcher:
+    return OwnerMatcher(list(names), list(ibans))
+
+
+def get_owner_matcher() -> OwnerMatcher:
+    """Returns the matcher for the current settings, rebuilt only when they change."""
+    names = []
+    if settings.first_name and settings.last_name:
+        names.append(f"{settings.first_name} {settings.last_name}")
+    names += settings.identity.aliases + settings.identity.household
+
+    return _build_matcher(tuple(names), tuple(settings.identity.ibans))
+
+
+def is_self_transfer(receiver: str | None) -> bool:
+    """Checks if the receiver is the user, a household member or an own account."""
+    return get_owner_matcher().match(receiver)
+
+
+def update_self_transfer_flags(conn: Connection) -> int:
+    """Re-evaluates is_self_transfer for every receiver. Returns the rows flagged."""
+    receivers = conn.exec_driver_sql(
+        'SELECT DISTINCT receiver FROM "transaction" WHERE receiver IS NOT NULL'
+    ).scalars()
+    own = [(receiver,) for receiver in receivers if is_self_transfer(receiver)]
+
+    # Rows whose flag does not change are skipped, so the summary triggers
+    # only fire for transactions that actually move between the totals.
+    conn.exec_driver_sql(
+        'UPDATE "transaction" SET is_self_transfer = 0 WHERE is_self_transfer'
+        " AND receiver NOT IN (SELECT value FROM json_each(?))",
+        (json.dumps([receiver for (receiver,) in own]),),
+    )
+    if own:
+        conn.exec_driver_sql(
+            'UPDATE "transaction" SET is_self_transfer = 1'
+            " WHERE receiver = ? AND NOT is_self_transfer",
+            own,
+        )
+    return conn.exec_driver_sql(
+        'SELECT count(*) FROM "transaction" WHERE is_self_transfer'
+    ).scalar_one()
@@ -1,9 +1,23 @@
-from pathlib import Path
-from typing import Optional, cast
+import csv
+import hashlib
+import io
+import re
+from collections import defaultdict
+from collections.abc import Iterator
+from itertools import batched
+from typing import TYPE_CHECKING, BinaryIO, Optional, TextIO, cast
 
-from sqlmodel import SQLModel
+from sqlmodel import Field, SQLModel
 
-from budy.schemas import Transaction
+from budy.config import BankConfig
+from budy.identity import get_owner_matcher
+from budy.rules import RuleMatcher
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Bytes read to recognize a statement's bank; header rows are far shorter.
+SNIFF_SIZE = 64 * 1024
 
 
 class BaseBankImporter(SQLModel):
@@ -12,6 +26,7 @@ class BaseBankImporter(SQLModel):
     delimiter: str = ","
     encoding: str = "utf-8"
     decimal: str = "."
+    thousands: Optional[str] = None
 
     # Required columns for core functionality
     date_col: str
@@ -22,87 +37,328 @@ class BaseBankImporter(SQLModel):
     # Optional columns for richer data
     receiver_col: Optional[str] = None
     description_col: Optional[str] = None
+    # The bank's unique archive/reference ID, used to skip rows imported before
+    reference_col: Optional[str] = None
 
-    def process_file(self, file_path: Path) -> list[Transaction]:
-        """Processes a bank statement CSV file and returns a list of Transaction objects."""
-        import polars as pl
+    # Known formats and types, so parsing needs no guessing or inference
+    date_format: Optional[str] = None
+    dtypes: dict[str, str] = Field(default_factory=dict)
 
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+    def iter_batches(
+        self, binary: BinaryIO, batch_size: int, rules: RuleMatcher | None = None
+    ) -> Iterator["pl.DataFrame"]:
+        """
+        Processes a statement stream (a file or stdin) in batches of at most
+        `batch_size` records, so memory stays flat however long the statement.
+        Yields frames of expenses with the columns entry_date, amount, receiver,
+        description, category_id, is_self_transfer and dedup_key. Categories
+        come from `rules`, if given. Rows whose date or amount cannot be parsed
+        have a null in that column. The stream is left open.
+        """
+        import polars as pl
 
+        stream = io.TextIOWrapper(binary, encoding=self.encoding, newline="")
         try:
-            df = pl.read_csv(
-                file_path,
-                separator=self.delimiter,
-                decimal_comma=(self.decimal == ","),
-                encoding=self.encoding,
-                infer_schema_length=10000,
-            )
+            # Exports from Windows tools often start with a byte order mark.
+            header = stream.readline().lstrip("\ufeff")
+            if not header:
+                return
+
+            options = self._read_options(header)
+            seen = None
+            for records in batched(_read_records(stream), batch_size):
+                try:
+                    df = pl.read_csv((header + "".join(records)).encode(), **options)
+                    result, seen = self._process_frame(df, seen=seen, rules=rules)
+                except Exception as e:
+                    raise RuntimeError(f"Error parsing CSV: {e}") from e
+                yield result
+        finally:
+            stream.detach()
+
+    def _amount_cents(self, amount: "pl.Expr") -> "pl.Expr":
+        """
+        Parses amount strings such as "-1 234,5" into whole cents without going
+        through floats. Values that are not plain amounts become null.
+        """
+        import polars as pl
+
+        text = amount.str.replace_all(r"[\s\u00a0]", "")
+        if self.thousands:
+            text = text.str.replace_all(self.thousands, "", literal=True)
+
+        decimal = re.escape(self.decimal)
+        parts = text.str.extract_groups(rf"^[+-]?(\d*)(?:{decimal}(\d{{1,2}}))?$")
+        units, fraction = parts.struct.field("1"), parts.struct.field("2")
+        cents = fraction.fill_null("").str.pad_end(2, "0").cast(pl.Int64)
+        # Either part may be left out (".5", "12"), but not both.
+        return (
+            pl.when((units != "") | fraction.is_not_null())
+            .then(units.str.pad_start(1, "0").cast(pl.Int64) * 100 + cents)
+            .otherwise(None)
+        )
 
-            required_cols = {self.date_col, self.amount_col, self.debit_credit_col}
+    def _read_options(self, header: str) -> dict:
+        """
+        Arguments for pl.read_csv that read only the configured columns, with
+        fixed types instead of inferring them from the data.
+        """
+        import polars as pl
+
+        names = next(csv.reader([header.lstrip("\ufeff")], delimiter=self.delimiter))
+        names = list(dict.fromkeys(names))
+        wanted = {
+            self.date_col: pl.String,
+            self.amount_col: pl.String,
+            self.debit_credit_col: pl.String,
+            self.receiver_col: pl.String,
+            self.description_col: pl.String,
+            self.reference_col: pl.String,
+        }
+        for column, dtype_name in self.dtypes.items():
+            dtype = getattr(pl, dtype_name, None)
+            if not (isinstance(dtype, type) and issubclass(dtype, pl.DataType)):
+                raise ValueError(f"Unknown dtype '{dtype_name}' for column '{column}'.")
+            wanted[column] = dtype
+
+        # Missing columns are left out; _process_frame reports required ones.
+        columns = [name for name in names if name in wanted]
+        return {
+            "separator": self.delimiter,
+            "decimal_comma": self.decimal == ",",
+            "columns": columns,
+            "schema_overrides": {name: wanted[name] for name in columns},
+            "infer_schema": False,
+        }
+
+    def _process_frame(
+        self,
+        df: "pl.DataFrame",
+        seen: "pl.DataFrame | None",
+        rules: RuleMatcher | None = None,
+    ) -> tuple["pl.DataFrame", "pl.DataFrame"]:
+        """
+        Turns raw CSV rows into expenses. `seen` counts the rows of earlier
+        batches by content, so repeats are numbered across the whole file.
+        Returns the expenses and the updated counts.
+        """
+        import polars as pl
 
-            if not required_cols.issubset(df.columns):
-                missing = required_cols - set(df.columns)
-                raise ValueError(f"CSV missing required columns: {missing}")
+        required_cols = {self.date_col, self.amount_col, self.debit_credit_col}
 
-            # Start building the lazy query
-            q = df.lazy().filter(
-                pl.col(self.debit_credit_col).str.strip_chars().str.to_uppercase()
-                == self.debit_value
+        if not required_cols.issubset(df.columns):
+            missing = required_cols - set(df.columns)
+            raise ValueError(f"CSV missing required columns: {missing}")
+
+        # Start building the lazy query
+        q = df.lazy().filter(
+            pl.col(self.debit_credit_col).str.strip_chars().str.to_uppercase()
+            == self.debit_value
+        )
+
+        # 1. Parse Date, with the configured format or guessing it per value
+        parsed_date = pl.col(self.date_col)
+        if df.schema[self.date_col] != pl.Date:
+            parsed_date = parsed_date.str.strptime(
+                pl.Date, format=self.date_format, strict=False
             )
+        q = q.with_columns(parsed_date.alias("parsed_date"))
+
+        # 2. Parse Amount into whole cents, null if it is not a valid amount
+        if df.schema[self.amount_col].is_numeric():
+            # A dtype override read it as a number already; round away float error.
+            amount_cents = (pl.col(self.amount_col).abs() * 100).round().cast(pl.Int64)
+        else:
+            amount_cents = self._amount_cents(pl.col(self.amount_col))
+        q = q.with_columns(amount_cents.alias("amount_cents"))
 
-            # 1. Parse Date
+        # 3. Parse Receiver (Optional), empty values become null
+        if self.receiver_col and self.receiver_col in df.columns:
+            receiver = pl.col(self.receiver_col).cast(pl.String)
             q = q.with_columns(
-                pl.col(self.date_col)
-                .str.strptime(pl.Date, strict=False)
-                .alias("parsed_date")
+                pl.when(receiver != "").then(receiver).alias("receiver_val")
             )
+        else:
+            q = q.with_columns(pl.lit(None).cast(pl.String).alias("receiver_val"))
 
-            # 2. Parse Amount (handle cents)
-            # We must .round() before casting to Int64 to handle floating point imprecision.
-            # E.g., 19.999999 should become 20, not truncated to 19.
+        # 4. Parse Description (Optional), empty values become null
+        if self.description_col and self.description_col in df.columns:
+            description = pl.col(self.description_col).cast(pl.String)
             q = q.with_columns(
-                (pl.col(self.amount_col).abs() * 100)
-                .round()
-                .cast(pl.Int64)
-                .alias("amount_cents")
+                pl.when(description != "").then(description).alias("desc_val")
             )
+        else:
+            q = q.with_columns(pl.lit(None).cast(pl.String).alias("desc_val"))
+
+        # 5. Flag transfers to the user's own accounts
+        q = q.with_columns(
+            get_owner_matcher().expr(pl.col("receiver_val")).alias("self_transfer")
+        )
+
+        # Unparseable rows are kept, with nulls, so that callers can report them.
+        invalid = pl.col("parsed_date").is_null() | pl.col("amount_cents").is_null()
+        q = q.filter(invalid | (pl.col("amount_cents") > 0))
 
-            # 3. Parse Receiver (Optional)
-            if self.receiver_col and self.receiver_col in df.columns:
-                q = q.with_columns(
-                    pl.col(self.receiver_col).fill_null("").alias("receiver_val")
-                )
-            else:
-                q = q.with_columns(pl.lit(None).cast(pl.String).alias("receiver_val"))
-
-            # 4. Parse Description (Optional)
-            if self.description_col and self.description_col in df.columns:
-                q = q.with_columns(
-                    pl.col(self.description_col).fill_null("").alias("desc_val")
-                )
-            else:
-                q = q.with_columns(pl.lit(None).cast(pl.String).alias("desc_val"))
-
-            # Final Selection
-            result = cast(
-                pl.DataFrame,
-                (
-                    q.drop_nulls(subset=["parsed_date", "amount_cents"])
-                    .filter(pl.col("amount_cents") > 0)
-                    .select(["parsed_date", "amount_cents", "receiver_val", "desc_val"])
-                ).collect(),
+        # 6. Categorize by the first rule occurring in receiver or description
+        if rules is not None:
+            text_to_match = pl.concat_str(
+                [
+                    pl.col("receiver_val").fill_null(""),
+                    pl.col("desc_val").fill_null(""),
+                ],
+                separator=" ",
+            ).str.to_lowercase()
+            q = q.with_columns(rules.expr(text_to_match).alias("category"))
+        else:
+            q = q.with_columns(pl.lit(None, dtype=pl.Int64).alias("category"))
+
+        # 7. Dedup key: the bank's reference ID, or a digest of the row's content.
+        # Identical rows within a file are told apart by their occurrence index,
+        # so re-importing the same file is a no-op but genuine repeats are kept.
+        content = ["parsed_date", "amount_cents", "receiver_val", "desc_val"]
+        q = q.with_columns(pl.struct(content).hash().alias("_content"))
+        q = q.with_columns(pl.int_range(pl.len()).over("_content").alias("_occurrence"))
+        if seen is not None:
+            q = q.join(
+                seen.lazy(), on="_content", how="left", maintain_order="left"
+            ).with_columns(pl.col("_occurrence") + pl.col("_seen").fill_null(0))
+
+        fingerprint = pl.concat_str(
+            [
+                *(pl.col(c).cast(pl.String).fill_null("") for c in content),
+                pl.col("_occurrence").cast(pl.String),
+            ],
+            separator="\x1f",
+        )
+        # A fixed-width digest keeps the key and its unique index small.
+        dedup_key = pl.lit("row:") + fingerprint.map_batches(
+            _content_digests, return_dtype=pl.String, is_elementwise=True
+        )
+        if self.reference_col and self.reference_col in df.columns:
+            reference = pl.col(self.reference_col).cast(pl.String).str.strip_chars()
+            dedup_key = (
+                pl.when(reference != "")
+                .then(pl.lit("ref:") + reference)
+                .otherwise(dedup_key)
+            )
+
+        # Final Selection, named after the transaction columns
+        rows = cast(
+            pl.DataFrame,
+            q.select(
+                pl.col("parsed_date").alias("entry_date"),
+                pl.col("amount_cents").alias("amount"),
+                pl.col("receiver_val").alias("receiver"),
+                pl.col("desc_val").alias("description"),
+                pl.col("category").alias("category_id"),
+                pl.col("self_transfer").alias("is_self_transfer"),
+                dedup_key.alias("dedup_key"),
+                pl.col("_content"),
+            ).collect(),
+        )
+
+        counts = rows.group_by("_content").agg(pl.len().cast(pl.Int64).alias("_seen"))
+        if seen is not None:
+            counts = (
+                pl.concat([seen, counts])
+                .group_by("_content")
+                .agg(pl.col("_seen").sum())
             )
 
-            return [
-                Transaction(
-                    entry_date=row["parsed_date"],
-                    amount=row["amount_cents"],
-                    receiver=row["receiver_val"] or None,
-                    description=row["desc_val"] or None,
-                )
-                for row in result.to_dicts()
+        return rows.drop("_content"), counts
+
+
+def _content_digests(fingerprints: "pl.Series") -> "pl.Series":
+    """
+    Hashes row fingerprints with BLAKE2b. Unlike polars' own hash, the digest
+    is stable across versions, so it can be stored and matched on re-import.
+    """
+    import polars as pl
+
+    return pl.Series(
+        [
+            hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+            for fingerprint in fingerprints
+        ],
+        dtype=pl.String,
+    )
+
+
+def _read_records(stream: TextIO) -> Iterator[str]:
+    """Yields CSV records, joining lines while a quoted field spans a line break."""
+    record = ""
+    for line in stream:
+        record += line
+        # Escaped quotes ("") come in pairs, so an odd count means an open field.
+        if record.count('"') % 2 == 0:
+            yield record
+            record = ""
+    if record:
+        yield record
+
+
+class BankDetector:
+    """
+    Recognizes which configured bank exported a statement from its header
+    row alone. The column sets of all banks are indexed up front, grouped by
+    delimiter and encoding, so each header is split and decoded once per group.
+    """
+
+    def __init__(self, banks: dict[str, BankConfig]):
+        self._signatures: dict[tuple[str, str], list[tuple[str, frozenset[str]]]]
+        self._signatures = defaultdict(list)
+        self._xml_banks: list[str] = []
+        for name, config in banks.items():
+            if config.format == "camt053":
+                self._xml_banks.append(name)
+                continue
+            columns = [
+                config.date_col,
+                config.amount_col,
+                config.debit_credit_col,
+                config.receiver_col,
+                config.description_col,
+                config.reference_col,
             ]
+            self._signatures[(config.delimiter, config.encoding)].append(
+                (name, frozenset(c for c in columns if c))
+            )
+
+    def detect(self, head: bytes) -> str | None:
+        """
+        Returns the bank whose columns all appear in the header, preferring the
+        bank that names the most of them, or None if no bank matches.
+        Raises ValueError if several banks match equally well.
+        """
+        if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<"):
+            if b"camt.053" not in head:
+                return None
+            if len(self._xml_banks) > 1:
+                names = ", ".join(sorted(self._xml_banks))
+                raise ValueError(f"Statement matches several banks: {names}.")
+            return self._xml_banks[0] if self._xml_banks else None
+
+        line = head.split(b"\n", 1)[0].rstrip(b"\r")
+        candidates: list[tuple[int, str]] = []
+
+        for (delimiter, encoding), banks in self._signatures.items():
+            try:
+                text = line.decode(encoding).lstrip("\ufeff")
+            except UnicodeDecodeError:
+                continue  # The header is not in this group's encoding.
+            except LookupError:
+                continue  # An unknown encoding matches no statement.
+            row = next(csv.reader([text], delimiter=delimiter))
+            header = {column.strip() for column in row}
+            candidates += [
+                (len(columns), name) for name, columns in banks if columns <= header
+            ]
+
+        if not candidates:
+            return None
 
-        except Exception as e:
-            raise RuntimeError(f"Error parsing CSV: {e}") from e
+        best = max(size for size, _ in candidates)
+        names = sorted(name for size, name in candidates if size == best)
+        if len(names) > 1:
+            raise ValueError(f"Header matches several banks: {', '.join(names)}.")
+        return names[0]
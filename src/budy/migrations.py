@@ -0,0 +1,198 @@
+from collections.abc import Callable
+
+from sqlalchemy import Connection, Engine, inspect
+from sqlmodel import SQLModel
+
+from budy.identity import update_self_transfer_flags
+from budy.payees import intern_payees, normalize_payee
+from budy.schemas import (
+    MONTHLY_SUMMARY_REBUILD,
+    MONTHLY_SUMMARY_TRIGGERS,
+    TRANSACTION_SEARCH_REBUILD,
+    TRANSACTION_SEARCH_TABLE,
+    TRANSACTION_SEARCH_TRIGGERS,
+    AppState,
+    ImportBatch,
+    ImportJournal,
+    MonthlySummary,
+    Payee,
+)
+
+# The schema version is stored in SQLite's `PRAGMA user_version`, so checking
+# whether a database is current costs a single pragma read.
+
+
+def _column_names(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """Adds a column unless it already exists (e.g. created by create_all)."""
+    if column not in _column_names(conn, table):
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}')
+
+
+def _baseline(conn: Connection) -> None:
+    """Creates missing tables and upgrades databases from before versioning."""
+    SQLModel.metadata.create_all(conn)
+    _add_column(conn, "transaction", "category_id", "INTEGER REFERENCES category(id)")
+
+
+def _add_search_index(conn: Connection) -> None:
+    """Creates the transaction full-text index."""
+    conn.exec_driver_sql(TRANSACTION_SEARCH_TABLE)
+
+
+def _add_monthly_summary(conn: Connection) -> None:
+    """Creates the monthly summary table."""
+    SQLModel.metadata.create_all(conn, tables=[MonthlySummary.__table__])  # type: ignore[list-item]
+
+
+def _add_self_transfer_flag(conn: Connection) -> None:
+    """Stores whether a transaction is a transfer to the user's own accounts."""
+    _add_column(conn, "transaction", "is_self_transfer", "BOOLEAN NOT NULL DEFAULT 0")
+    _add_column(
+        conn, "monthlysummary", "self_transfer_amount", "INTEGER NOT NULL DEFAULT 0"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_transaction_is_self_transfer"
+        ' ON "transaction" (is_self_transfer) WHERE is_self_transfer'
+    )
+    update_self_transfer_flags(conn)
+
+
+def _add_payees(conn: Connection) -> None:
+    """Creates the payee table and links existing transactions to their payee."""
+    SQLModel.metadata.create_all(conn, tables=[Payee.__table__])  # type: ignore[list-item]
+    _add_column(conn, "transaction", "payee_id", "INTEGER REFERENCES payee(id)")
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_transaction_payee_id ON "transaction" (payee_id)'
+    )
+
+    receivers = (
+        conn.exec_driver_sql(
+            'SELECT DISTINCT receiver FROM "transaction" WHERE receiver IS NOT NULL'
+        )
+        .scalars()
+        .all()
+    )
+    payee_ids = intern_payees(conn, receivers)
+    links = [
+        (payee_ids[normalize_payee(receiver)], receiver)
+        for receiver in receivers
+        if normalize_payee(receiver) in payee_ids
+    ]
+    if links:
+        conn.exec_driver_sql(
+            'UPDATE "transaction" SET payee_id = ? WHERE receiver = ?', links
+        )
+
+
+def _add_dedup_key(conn: Connection) -> None:
+    """Adds the unique key that makes re-importing a statement a no-op."""
+    _add_column(conn, "transaction", "dedup_key", "VARCHAR")
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_transaction_dedup_key"
+        ' ON "transaction" (dedup_key)'
+    )
+
+
+def _add_app_state(conn: Connection) -> None:
+    """Creates the key/value table for bookkeeping state."""
+    SQLModel.metadata.create_all(conn, tables=[AppState.__table__])  # type: ignore[list-item]
+
+
+def _add_import_journal(conn: Connection) -> None:
+    """Creates the table recording the progress of statement imports."""
+    SQLModel.metadata.create_all(conn, tables=[ImportJournal.__table__])  # type: ignore[list-item]
+
+
+def _add_import_batches(conn: Connection) -> None:
+    """Creates the import batch table and links transactions to their import."""
+    SQLModel.metadata.create_all(conn, tables=[ImportBatch.__table__])  # type: ignore[list-item]
+    _add_column(
+        conn, "transaction", "import_batch_id", "INTEGER REFERENCES importbatch(id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_transaction_import_batch_id"
+        ' ON "transaction" (import_batch_id)'
+    )
+
+
+def _sync_derived_objects(conn: Connection) -> None:
+    """
+    Recreates the triggers on "transaction" and rebuilds the tables they maintain.
+    Runs after every migration, so steps only change structure and the triggers
+    always match the latest definitions.
+    """
+    triggers = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master"
+        " WHERE type = 'trigger' AND tbl_name = 'transaction'"
+    ).scalars()
+    for name in list(triggers):
+        conn.exec_driver_sql(f'DROP TRIGGER "{name}"')
+
+    for statement in [
+        *TRANSACTION_SEARCH_TRIGGERS,
+        *MONTHLY_SUMMARY_TRIGGERS,
+        *TRANSACTION_SEARCH_REBUILD,
+        *MONTHLY_SUMMARY_REBUILD,
+    ]:
+        conn.exec_driver_sql(statement)
+
+
+# Ordered migration steps. Step N brings the schema to version N + 1.
+# Steps must tolerate objects that already exist, since an unversioned
+# database may already contain parts of the current schema.
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    _baseline,
+    _add_search_index,
+    _add_monthly_summary,
+    _add_self_transfer_flag,
+    _add_payees,
+    _add_dedup_key,
+    _add_app_state,
+    _add_import_journal,
+    _add_import_batches,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Returns the schema version recorded in the database."""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def migrate(engine: Engine) -> int:
+    """Applies pending migrations in a single transaction. Returns the number applied."""
+    with engine.connect() as conn:
+        if get_schema_version(conn) == SCHEMA_VERSION:
+            return 0
+
+        # Take the write lock up front so concurrent processes migrate only once.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        version = get_schema_version(conn)
+
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database schema version {version} is newer than supported "
+                f"({SCHEMA_VERSION}). Please upgrade budy."
+            )
+
+        if version == 0 and not inspect(conn).has_table("transaction"):
+            # Fresh database: the models already describe the latest schema.
+            SQLModel.metadata.create_all(conn)
+            pending = []
+        else:
+            pending = MIGRATIONS[version:]
+
+        for step in pending:
+            step(conn)
+        if pending:
+            _sync_derived_objects(conn)
+
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+    return SCHEMA_VERSION - version
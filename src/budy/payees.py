@@ -0,0 +1,48 @@
+from collections.abc import Iterable
+from itertools import batched
+
+from sqlalchemy import Connection
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import col, select
+
+from budy.schemas import Payee
+
+# SQLite limits the number of bound parameters per statement.
+_LOOKUP_BATCH_SIZE = 500
+
+
+def normalize_payee(name: str) -> str:
+    """Returns the key payees are interned by: case-folded, single-spaced."""
+    return " ".join(name.split()).casefold()
+
+
+def intern_payees(conn: Connection, names: Iterable[str | None]) -> dict[str, int]:
+    """
+    Maps receivers to payee ids, creating payees that do not exist yet.
+    The result is keyed by normalized name, see normalize_payee.
+    """
+    display_names: dict[str, str] = {}
+    for name in names:
+        if name and name.strip():
+            display_names.setdefault(normalize_payee(name), " ".join(name.split()))
+
+    if not display_names:
+        return {}
+
+    conn.execute(
+        insert(Payee).on_conflict_do_nothing(index_elements=["normalized_name"]),
+        [
+            {"normalized_name": key, "display_name": display}
+            for key, display in display_names.items()
+        ],
+    )
+
+    payee_ids: dict[str, int] = {}
+    for keys in batched(display_names, _LOOKUP_BATCH_SIZE):
+        rows = conn.execute(
+            select(Payee.normalized_name, Payee.id).where(
+                col(Payee.normalized_name).in_(keys)
+            )
+        )
+        payee_ids.update({key: payee_id for key, payee_id in rows})
+    return payee_ids
@@ -87,10 +87,20 @@ def run_search(
             help="Maximum number of results to display.",
         ),
     ] = 20,
+    substring: Annotated[
+        bool,
+        Option(
+            "--substring",
+            help="Match the text anywhere, also inside words. Scans every "
+            "transaction and ignores case for ASCII letters only.",
+        ),
+    ] = False,
 ) -> None:
     """Search transactions by keyword in receiver or description."""
     with Session(engine) as session:
-        results = search_transactions(session=session, query=query, limit=limit)
+        results = search_transactions(
+            session=session, query=query, limit=limit, substring=substring
+        )
 
     if not results:
         console.print(
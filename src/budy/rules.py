@@ -0,0 +1,54 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import polars as pl
+
+
+class RuleMatcher:
+    """
+    Matches category rule patterns against whole text columns at once.
+    Rules are given in priority order; the first one occurring in a text wins.
+    """
+
+    def __init__(self, rules: list[tuple[str, int]]):
+        self.rules = rules
+
+    def expr(self, text: "pl.Expr") -> "pl.Expr":
+        """Polars expression categorizing a whole text column at once."""
+        import polars as pl
+
+        categories = {p: category for p, (_, category) in enumerate(self.rules)}
+        return self.priority_expr(text).replace_strict(
+            categories, default=None, return_dtype=pl.Int64
+        )
+
+    def priority_expr(self, text: "pl.Expr") -> "pl.Expr":
+        """
+        Polars expression for the position of the first matching rule. Polars
+        builds an Aho–Corasick automaton from the patterns each time the
+        expression is evaluated and scans every text with it once; the lowest
+        priority among the matches wins.
+        """
+        import polars as pl
+
+        priorities: dict[str, int] = {}
+        fallback = None
+        for priority, (pattern, _) in enumerate(self.rules):
+            # An empty pattern matches everything, so later rules never apply.
+            if not pattern:
+                fallback = priority
+                break
+            priorities.setdefault(pattern, priority)
+
+        best = pl.lit(None, dtype=pl.Int64)
+        if priorities:
+            best = (
+                text.str.extract_many(list(priorities), overlapping=True)
+                .list.eval(
+                    pl.element().replace_strict(priorities, return_dtype=pl.Int64)
+                )
+                .list.min()
+            )
+        if fallback is not None:
+            best = best.fill_null(pl.lit(fallback, dtype=pl.Int64))
+        return best
@@ -1,7 +1,10 @@
-from datetime import date
+from datetime import date, datetime
 
+from sqlalchemy import DDL, Index, event, inspect, text
 from sqlmodel import Field, SQLModel
 
+from budy.identity import is_self_transfer
+
 
 class Category(SQLModel, table=True):
     """Class that defines transaction categories."""
@@ -19,15 +22,253 @@ class CategoryRule(SQLModel, table=True):
     category_id: int = Field(foreign_key="category.id")
 
 
+class Payee(SQLModel, table=True):
+    """A receiver, stored once and referenced by its transactions."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    # Case-folded with whitespace collapsed, see budy.payees.normalize_payee.
+    normalized_name: str = Field(unique=True, index=True)
+    display_name: str
+    # Assigned on import when no category rule matches.
+    category_id: int | None = Field(default=None, foreign_key="category.id")
+
+
 class Transaction(SQLModel, table=True):
     """Class that defines all transactions."""
 
     id: int | None = Field(default=None, primary_key=True)
     amount: int
+    # SQLite index entries end with the rowid, so this index also serves
+    # keyset pagination over (entry_date, id).
     entry_date: date = Field(index=True)
     receiver: str | None = Field(default=None, index=True)
+    payee_id: int | None = Field(default=None, foreign_key="payee.id", index=True)
     description: str | None = Field(default=None)
     category_id: int | None = Field(default=None, foreign_key="category.id")
+    # Set by imports; identical keys are skipped, so re-imports are idempotent.
+    dedup_key: str | None = Field(default=None, unique=True, index=True)
+    # Derived from the receiver on every write so reports can filter in SQL.
+    is_self_transfer: bool = Field(default=False)
+    # The import that added the row, so a whole import can be rolled back.
+    import_batch_id: int | None = Field(
+        default=None, foreign_key="importbatch.id", index=True
+    )
+
+    # Self-transfers are rare, so only they are indexed; a full index on the
+    # flag would be maintained on every write without ever being selective.
+    __table_args__ = (
+        Index(
+            "ix_transaction_is_self_transfer",
+            "is_self_transfer",
+            sqlite_where=text("is_self_transfer"),
+        ),
+    )
+
+
+@event.listens_for(Transaction, "before_insert")
+@event.listens_for(Transaction, "before_update")
+def _flag_self_transfer(mapper, connection, target: Transaction) -> None:
+    target.is_self_transfer = is_self_transfer(target.receiver)
+
+
+def _intern_receiver(connection, receiver: str | None) -> int | None:
+    from budy.payees import intern_payees, normalize_payee
+
+    if not receiver or not receiver.strip():
+        return None
+    return intern_payees(connection, [receiver])[normalize_payee(receiver)]
+
+
+@event.listens_for(Transaction, "before_insert")
+def _assign_payee_on_insert(mapper, connection, target: Transaction) -> None:
+    # Bulk imports intern payees up front and arrive with payee_id already set.
+    if target.payee_id is None:
+        target.payee_id = _intern_receiver(connection, target.receiver)
+
+
+@event.listens_for(Transaction, "before_update")
+def _assign_payee_on_update(mapper, connection, target: Transaction) -> None:
+    if inspect(target).attrs.receiver.history.has_changes():
+        target.payee_id = _intern_receiver(connection, target.receiver)
+
+
+# Full-text index over receiver/description for `reports search`. It is an
+# external-content FTS5 table kept in sync with "transaction" by triggers;
+# unicode61 with remove_diacritics folds case and accents (õ, ä, ö, ü) alike.
+TRANSACTION_SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaction_fts USING fts5(
+        receiver, description,
+        content='transaction', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+TRANSACTION_SEARCH_DELETE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_delete
+    AFTER DELETE ON "transaction" BEGIN
+        INSERT INTO transaction_fts (transaction_fts, rowid, receiver, description)
+        VALUES ('delete', old.id, old.receiver, old.description);
+    END
+"""
+
+TRANSACTION_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_insert
+    AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO transaction_fts (rowid, receiver, description)
+        VALUES (new.id, new.receiver, new.description);
+    END
+    """,
+    TRANSACTION_SEARCH_DELETE_TRIGGER,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_update
+    AFTER UPDATE OF id, receiver, description ON "transaction" BEGIN
+        INSERT INTO transaction_fts (transaction_fts, rowid, receiver, description)
+        VALUES ('delete', old.id, old.receiver, old.description);
+        INSERT INTO transaction_fts (rowid, receiver, description)
+        VALUES (new.id, new.receiver, new.description);
+    END
+    """,
+]
+
+TRANSACTION_SEARCH_REBUILD = [
+    "INSERT INTO transaction_fts (transaction_fts) VALUES ('rebuild')",
+]
+
+# Takes the rows of one import out of the search index in a single statement,
+# instead of the delete trigger firing per row; bound to :import_batch_id.
+TRANSACTION_SEARCH_DELETE_IMPORT = """
+    INSERT INTO transaction_fts (transaction_fts, rowid, receiver, description)
+    SELECT 'delete', id, receiver, description FROM "transaction"
+    WHERE import_batch_id = :import_batch_id
+"""
+
+
+class MonthlySummary(SQLModel, table=True):
+    """Spending totals per month and category, maintained by triggers on transaction."""
+
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True)
+    # 0 stands for "uncategorized" so the key never contains NULL.
+    category_id: int = Field(default=0, primary_key=True)
+    total_amount: int = 0
+    # Part of total_amount that went to the user's own accounts.
+    self_transfer_amount: int = 0
+    count: int = 0
+
+
+_SUMMARY_KEY = """
+    CAST(strftime('%Y', {row}.entry_date) AS INTEGER),
+    CAST(strftime('%m', {row}.entry_date) AS INTEGER),
+    coalesce({row}.category_id, 0)
+"""
+
+_SUMMARY_SELF_TRANSFER = "CASE WHEN {row}.is_self_transfer THEN {row}.amount ELSE 0 END"
+
+_SUMMARY_ADD = f"""
+    INSERT INTO monthlysummary
+        (year, month, category_id, total_amount, self_transfer_amount, count)
+    VALUES (
+        {_SUMMARY_KEY.format(row="new")},
+        new.amount, {_SUMMARY_SELF_TRANSFER.format(row="new")}, 1
+    )
+    ON CONFLICT (year, month, category_id) DO UPDATE SET
+        total_amount = total_amount + excluded.total_amount,
+        self_transfer_amount = self_transfer_amount + excluded.self_transfer_amount,
+        count = count + 1;
+"""
+
+_SUMMARY_SUBTRACT = f"""
+    UPDATE monthlysummary
+    SET total_amount = total_amount - old.amount,
+        self_transfer_amount =
+            self_transfer_amount - {_SUMMARY_SELF_TRANSFER.format(row="old")},
+        count = count - 1
+    WHERE (year, month, category_id) = ({_SUMMARY_KEY.format(row="old")});
+    DELETE FROM monthlysummary
+    WHERE (year, month, category_id) = ({_SUMMARY_KEY.format(row="old")})
+    AND count <= 0;
+"""
+
+# Bulk updates may drop this trigger and rebuild the summaries instead.
+MONTHLY_SUMMARY_UPDATE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS monthlysummary_update
+    AFTER UPDATE OF amount, entry_date, category_id, is_self_transfer ON "transaction"
+    BEGIN {_SUMMARY_SUBTRACT} {_SUMMARY_ADD} END
+"""
+
+# Import rollbacks drop this trigger and subtract the import's totals at once.
+MONTHLY_SUMMARY_DELETE_TRIGGER = f"""
+    CREATE TRIGGER IF NOT EXISTS monthlysummary_delete
+    AFTER DELETE ON "transaction" BEGIN {_SUMMARY_SUBTRACT} END
+"""
+
+MONTHLY_SUMMARY_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS monthlysummary_insert
+    AFTER INSERT ON "transaction" BEGIN {_SUMMARY_ADD} END
+    """,
+    MONTHLY_SUMMARY_DELETE_TRIGGER,
+    MONTHLY_SUMMARY_UPDATE_TRIGGER,
+]
+
+MONTHLY_SUMMARY_REBUILD = [
+    "DELETE FROM monthlysummary",
+    f"""
+    INSERT INTO monthlysummary
+        (year, month, category_id, total_amount, self_transfer_amount, count)
+    SELECT
+        {_SUMMARY_KEY.format(row='"transaction"')},
+        sum(amount),
+        sum({_SUMMARY_SELF_TRANSFER.format(row='"transaction"')}),
+        count(*)
+    FROM "transaction"
+    GROUP BY 1, 2, 3
+    """,
+]
+
+# Takes the rows of one import out of the summaries; bound to :import_batch_id.
+MONTHLY_SUMMARY_SUBTRACT_IMPORT = [
+    f"""
+    WITH batch (year, month, category_id, total_amount, self_transfer_amount, count)
+    AS (
+        SELECT
+            {_SUMMARY_KEY.format(row='"transaction"')},
+            sum(amount),
+            sum({_SUMMARY_SELF_TRANSFER.format(row='"transaction"')}),
+            count(*)
+        FROM "transaction"
+        WHERE import_batch_id = :import_batch_id
+        GROUP BY 1, 2, 3
+    )
+    UPDATE monthlysummary
+    SET total_amount = monthlysummary.total_amount - batch.total_amount,
+        self_transfer_amount =
+            monthlysummary.self_transfer_amount - batch.self_transfer_amount,
+        count = monthlysummary.count - batch.count
+    FROM batch
+    WHERE (monthlysummary.year, monthlysummary.month, monthlysummary.category_id)
+        = (batch.year, batch.month, batch.category_id)
+    """,
+    "DELETE FROM monthlysummary WHERE count <= 0",
+]
+
+for _statement in [
+    TRANSACTION_SEARCH_TABLE,
+    *TRANSACTION_SEARCH_TRIGGERS,
+    *MONTHLY_SUMMARY_TRIGGERS,
+]:
+    event.listen(
+        Transaction.__table__,
+        "after_create",
+        # DDL() applies %-formatting, so literal percent signs are doubled.
+        DDL(_statement.replace("%", "%%")).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Transaction.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS transaction_fts").execute_if(dialect="sqlite"),
+)
 
 
 class Budget(SQLModel, table=True):
@@ -39,6 +280,64 @@ class Budget(SQLModel, table=True):
     target_year: int = Field(index=True)
 
 
+class ImportJournal(SQLModel, table=True):
+    """Progress of importing one statement file, so that imports can resume."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    # SHA-256 of the file's content; renamed or moved files are still recognized.
+    file_hash: str = Field(unique=True, index=True)
+    file_name: str
+    bank: str
+    # Valid rows of the statement, in file order, that have been committed.
+    rows_committed: int = 0
+    batches_committed: int = 0
+    completed: bool = False
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class ImportBatch(SQLModel, table=True):
+    """One run of importing a statement, which can be rolled back as a whole."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    file_name: str
+    # SHA-256 of the file's content; None for statements read from stdin.
+    file_hash: str | None = Field(default=None, index=True)
+    bank: str
+    imported_at: datetime = Field(default_factory=datetime.now)
+    # Rows the import added; rows skipped as duplicates belong to earlier ones.
+    row_count: int = 0
+
+
+class AppState(SQLModel, table=True):
+    """Small key/value store for bookkeeping, e.g. where a job last stopped."""
+
+    key: str = Field(primary_key=True)
+    value: str
+
+
+class TransactionPage(SQLModel):
+    """Represents one keyset-paginated page of transactions, oldest first."""
+
+    transactions: list[Transaction]
+    older_cursor: int | None = None
+    newer_cursor: int | None = None
+
+
+class ImportSummary(SQLModel):
+    """Represents the outcome of importing a bank statement."""
+
+    count: int = 0
+    # Rows that were already imported before.
+    skipped: int = 0
+    # Rows whose date or amount could not be parsed, and were not imported.
+    invalid: int = 0
+    # Banks the statements were read as, e.g. when detected from their headers.
+    banks: list[str] = Field(default_factory=list)
+    total_amount: int = 0
+    first_date: date | None = None
+    last_date: date | None = None
+
+
 class ForecastData(SQLModel):
     """Represents forecast data for budgeting."""
 
@@ -92,3 +391,28 @@ class BudgetSuggestion(SQLModel):
     amount: int
     year: int
     existing: Budget | None = None
+
+
+class RuleApplyItem(SQLModel):
+    """Represents how many transactions one rule re-categorized."""
+
+    rule_id: int
+    pattern: str
+    category_name: str
+    count: int
+
+
+class RuleApplySummary(SQLModel):
+    """Represents the outcome of applying the rules to stored transactions."""
+
+    scanned: int = 0
+    changed: int = 0
+    rules: list[RuleApplyItem] = Field(default_factory=list)
+
+
+class PragmaSetting(SQLModel):
+    """Represents the configured and effective value of a SQLite pragma."""
+
+    name: str
+    configured: str
+    effective: str
@@ -1,13 +1,13 @@
 import calendar
-from collections import defaultdict
 from datetime import date
 from statistics import mean
 from typing import Optional
 
-from sqlmodel import Session, asc, select
+from sqlalchemy import tuple_
+from sqlmodel import Session, asc, col, func, select
 
 from budy.config import settings
-from budy.schemas import Budget, BudgetSuggestion, Transaction
+from budy.schemas import Budget, BudgetSuggestion, MonthlySummary
 
 
 def get_budget(
@@ -180,16 +180,22 @@ def get_monthly_totals(
     start_date: date,
     end_date: date,
 ) -> dict[tuple[int, int], int]:
-    """Fetches transactions within a range and aggregates them by year, month."""
-    transactions = session.exec(
-        select(Transaction).where(
-            Transaction.entry_date >= start_date,
-            Transaction.entry_date < end_date,
+    """
+    Aggregates spending by year, month for the months starting within the range.
+    Reads the monthly summary table, so the cost grows with months, not transactions.
+    """
+    period = tuple_(col(MonthlySummary.year), col(MonthlySummary.month))
+    rows = session.exec(
+        select(
+            MonthlySummary.year,
+            MonthlySummary.month,
+            func.sum(MonthlySummary.total_amount),
         )
+        .where(
+            period >= tuple_(start_date.year, start_date.month),
+            period < tuple_(end_date.year, end_date.month),
+        )
+        .group_by(col(MonthlySummary.year), col(MonthlySummary.month))
     ).all()
 
-    totals = defaultdict(int)
-    for t in transactions:
-        totals[(t.entry_date.year, t.entry_date.month)] += t.amount
-
-    return totals
+    return {(year, month): total for year, month, total in rows}
@@ -1,6 +1,38 @@
-from sqlmodel import Session, select
+from datetime import date
+from typing import TYPE_CHECKING, cast
+from uuid import uuid4
 
-from budy.schemas import Category, CategoryRule
+from sqlalchemy import Connection, text
+from sqlmodel import Session, col, func, select
+
+from budy.database import begin_write
+from budy.rules import RuleMatcher
+from budy.schemas import (
+    MONTHLY_SUMMARY_REBUILD,
+    MONTHLY_SUMMARY_UPDATE_TRIGGER,
+    AppState,
+    Category,
+    CategoryRule,
+    RuleApplyItem,
+    RuleApplySummary,
+    Transaction,
+)
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Transactions scanned per batch when applying rules to stored transactions.
+_APPLY_BATCH_SIZE = 50_000
+# Above this many changes, rebuilding the monthly summaries once is cheaper
+# than maintaining them row by row with the update trigger.
+_BULK_UPDATE_THRESHOLD = 20_000
+# AppState key of the last transaction ID a full rules apply has seen.
+_APPLY_MARK = "rules_apply_mark"
+# AppState key of a token that changes with every rule change.
+_RULES_VERSION = "rules_version"
+
+# The matcher and the rules version it was built for.
+_rule_matcher: tuple[str, RuleMatcher] | None = None
 
 
 def create_category(*, session: Session, name: str, color: str = "white") -> Category:
@@ -34,8 +66,10 @@ def create_rule(*, session: Session, pattern: str, category_id: int) -> Category
     """Creates a new auto-categorization rule."""
     rule = CategoryRule(pattern=pattern.lower(), category_id=category_id)
     session.add(rule)
+    _bump_rules_version(session=session)
     session.commit()
     session.refresh(rule)
+    invalidate_rule_matcher()
     return rule
 
 
@@ -51,5 +85,179 @@ def delete_rule(*, session: Session, rule_id: int) -> bool:
     if not rule:
         return False
     session.delete(rule)
+    _bump_rules_version(session=session)
     session.commit()
+    invalidate_rule_matcher()
     return True
+
+
+def get_rule_matcher(*, session: Session) -> RuleMatcher:
+    """
+    Returns the matcher for the current rules, oldest rule first. The rules
+    are only loaded again after the rules version changed, which every rule
+    change in any process does; checking it is a single key lookup.
+    """
+    global _rule_matcher
+    version = (
+        session.exec(
+            select(AppState.value).where(AppState.key == _RULES_VERSION)
+        ).first()
+        or ""
+    )
+    if _rule_matcher is None or _rule_matcher[0] != version:
+        rules = session.exec(
+            select(CategoryRule.pattern, CategoryRule.category_id).order_by(
+                col(CategoryRule.id)
+            )
+        ).all()
+        _rule_matcher = (version, RuleMatcher(list(rules)))
+    return _rule_matcher[1]
+
+
+def _bump_rules_version(*, session: Session) -> None:
+    """Marks the rules as changed, in the transaction that changes them."""
+    state = session.get(AppState, _RULES_VERSION) or AppState(
+        key=_RULES_VERSION, value=""
+    )
+    state.value = uuid4().hex
+    session.add(state)
+
+
+def invalidate_rule_matcher() -> None:
+    """Drops the cached rule matcher after the rules changed."""
+    global _rule_matcher
+    _rule_matcher = None
+
+
+def apply_rules(
+    *,
+    session: Session,
+    overwrite: bool = False,
+    since: date | None = None,
+    only_new: bool = False,
+) -> RuleApplySummary:
+    """
+    Re-runs the rules over stored transactions, in batches but committed once.
+    By default only uncategorized transactions are touched; with `overwrite`
+    every transaction a rule matches gets that rule's category. Transactions
+    no rule matches keep their category. `only_new` skips transactions seen
+    by an earlier apply, `since` those dated before it.
+    """
+    import polars as pl
+
+    rules = session.exec(select(CategoryRule).order_by(col(CategoryRule.id))).all()
+    # Built from the rules loaded here, so priorities always index `rules`.
+    matcher = RuleMatcher([(rule.pattern, rule.category_id) for rule in rules])
+    summary = RuleApplySummary()
+    if not rules:
+        return summary
+
+    mark = session.get(AppState, _APPLY_MARK)
+    newest_id = session.exec(select(func.max(Transaction.id))).one() or 0
+
+    query = select(
+        Transaction.id,
+        Transaction.receiver,
+        Transaction.description,
+        Transaction.category_id,
+    )
+    if not overwrite:
+        query = query.where(col(Transaction.category_id).is_(None))
+    if since:
+        query = query.where(Transaction.entry_date >= since)
+    if only_new and mark:
+        query = query.where(col(Transaction.id) > int(mark.value))
+
+    text_to_match = pl.concat_str(
+        [pl.col("receiver").fill_null(""), pl.col("description").fill_null("")],
+        separator=" ",
+    ).str.to_lowercase()
+    schema = {
+        "id": pl.Int64,
+        "receiver": pl.String,
+        "description": pl.String,
+        "category_id": pl.Int64,
+    }
+
+    columns = ["id", "new_category_id", "priority"]
+    changed = [pl.DataFrame(schema=dict.fromkeys(columns, pl.Int64))]
+    last_id = 0
+    conn = session.connection()
+    # Keyset batches over the primary key keep memory flat on large ledgers.
+    while True:
+        rows = conn.execute(
+            query.where(col(Transaction.id) > last_id)
+            .order_by(col(Transaction.id))
+            .limit(_APPLY_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        frame = pl.DataFrame(rows, schema=schema, orient="row")
+        last_id = cast(int, frame["id"][-1])
+        summary.scanned += frame.height
+
+        changes = (
+            frame.with_columns(matcher.priority_expr(text_to_match).alias("priority"))
+            .with_columns(
+                pl.col("priority")
+                .replace_strict(
+                    {p: rule.category_id for p, rule in enumerate(rules)},
+                    default=None,
+                    return_dtype=pl.Int64,
+                )
+                .alias("new_category_id")
+            )
+            .filter(
+                pl.col("new_category_id").is_not_null()
+                & pl.col("category_id").ne_missing(pl.col("new_category_id"))
+            )
+        )
+        changed.append(changes.select(columns))
+
+    changes = pl.concat(changed)
+    if not changes.is_empty():
+        _update_categories(conn, changes)
+
+    # A run restricted by date may skip older rows, so it does not move the mark.
+    if since is None:
+        mark = mark or AppState(key=_APPLY_MARK, value="0")
+        mark.value = str(newest_id)
+        session.add(mark)
+    session.commit()
+
+    names = dict(session.exec(select(Category.id, Category.name)).all())
+    counts = changes.group_by("priority").len().sort("priority")
+    for priority, count in counts.iter_rows():
+        rule = rules[priority]
+        summary.rules.append(
+            RuleApplyItem(
+                rule_id=cast(int, rule.id),
+                pattern=rule.pattern,
+                category_name=names.get(rule.category_id, "Unknown"),
+                count=count,
+            )
+        )
+    summary.changed = changes.height
+    return summary
+
+
+def _update_categories(conn: Connection, changes: "pl.DataFrame") -> None:
+    """Writes new category IDs, keeping the monthly summaries in step."""
+    # Each updated row moves its amount between summaries; for many rows a
+    # single rebuild is far cheaper than the trigger firing once per row.
+    bulk = changes.height > _BULK_UPDATE_THRESHOLD
+    if bulk:
+        # Keeps the trigger if anything below fails or is interrupted.
+        begin_write(conn)
+        conn.execute(text("DROP TRIGGER monthlysummary_update"))
+
+    # Plain parameter tuples; compiling a statement per row would dominate.
+    conn.exec_driver_sql(
+        'UPDATE "transaction" SET category_id = ? WHERE id = ?',
+        changes.select("new_category_id", "id").rows(),
+    )
+
+    if bulk:
+        for statement in [*MONTHLY_SUMMARY_REBUILD, MONTHLY_SUMMARY_UPDATE_TRIGGER]:
+            conn.execute(text(statement))
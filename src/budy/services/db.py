@@ -0,0 +1,31 @@
+from sqlalchemy import text
+from sqlmodel import Session
+
+from budy.config import settings
+from budy.database import SQLITE_PRAGMAS
+from budy.schemas import PragmaSetting
+
+# SQLite reports these pragmas as integers; map them back to their config names.
+_PRAGMA_NAMES = {
+    "synchronous": ["off", "normal", "full", "extra"],
+    "temp_store": ["default", "file", "memory"],
+}
+
+
+def get_pragmas(*, session: Session) -> list[PragmaSetting]:
+    """Returns the configured and effective value of each SQLite pragma."""
+    pragmas = []
+    for name in SQLITE_PRAGMAS:
+        # Pragmas that do not apply (e.g. mmap_size for in-memory databases) return no row.
+        effective = session.execute(text(f"PRAGMA {name}")).scalar()
+        if name in _PRAGMA_NAMES and isinstance(effective, int):
+            effective = _PRAGMA_NAMES[name][effective]
+
+        pragmas.append(
+            PragmaSetting(
+                name=name,
+                configured=str(getattr(settings.database, name)),
+                effective="n/a" if effective is None else str(effective),
+            )
+        )
+    return pragmas
@@ -5,13 +5,16 @@ from datetime import date
 from statistics import mean
 from typing import Optional
 
-from sqlmodel import Session, desc, select
+from sqlalchemy import text
+from sqlmodel import Session, col, desc, func, select
 
-from budy.config import settings
 from budy.schemas import (
+    MONTHLY_SUMMARY_REBUILD,
     Budget,
     ForecastData,
     MonthlyReportData,
+    MonthlySummary,
+    Payee,
     PayeeRankingItem,
     Transaction,
     VolatilityReportData,
@@ -19,69 +22,12 @@ from budy.schemas import (
 )
 
 
-def _get_name_variants(name: str) -> set[str]:
-    """Generates variants of a name (lowercase, initials, mixed forms)."""
-    clean_name = name.strip().lower()
-    parts = clean_name.split()
-
-    if not parts:
-        return {clean_name}
-
-    # Banks often format names inconsistently in statement descriptions (e.g., "J. Smith" vs "J.Smith" vs "J Smith").
-    # We generate all common variations to ensure we can identify the user regardless of how the bank formatted the receiver field.
-    variants = {clean_name}
-
-    # 1. All Initials (e.g. "khl", "k.h.l.", "k. h. l.")
-    initials_chars = [p[0] for p in parts]
-    variants.add("".join(initials_chars))
-    variants.add(".".join(initials_chars) + ".")
-    variants.add(". ".join(initials_chars) + ".")
-
-    if len(parts) > 1:
-        last_name = parts[-1]
-        first_names = parts[:-1]
-        first_initials_chars = [p[0] for p in first_names]
-
-        # 2. First name initial + Last name full (e.g. "k laurits", "k. laurits")
-        first_initial = first_names[0][0]
-        variants.add(f"{first_initial} {last_name}")
-        variants.add(f"{first_initial}. {last_name}")
-        variants.add(f"{first_initial}.{last_name}")
-
-        # 3. All first names initialed + Last name full (e.g. "k. h. laurits")
-        if len(first_names) > 1:
-            # "kh laurits"
-            variants.add(f"{''.join(first_initials_chars)} {last_name}")
-            # "k. h. laurits"
-            dotted_spaced = ". ".join(first_initials_chars) + "."
-            variants.add(f"{dotted_spaced} {last_name}")
-            # "k.h. laurits"
-            dotted_tight = ".".join(first_initials_chars) + "."
-            variants.add(f"{dotted_tight} {last_name}")
-
-    return variants
-
-
-def _is_user(receiver: str | None) -> bool:
-    """Checks if the receiver matches the configured user (fuzzy match)."""
-    if not receiver:
-        return False
-
-    if not settings.first_name or not settings.last_name:
-        return False
-
-    receiver_clean = receiver.strip().lower()
-    full_name = f"{settings.first_name} {settings.last_name}"
-
-    user_variants = _get_name_variants(full_name)
-    if receiver_clean in user_variants:
-        return True
-
-    receiver_variants = _get_name_variants(receiver)
-    if full_name.lower() in receiver_variants:
-        return True
-
-    return False
+def rebuild_monthly_summaries(*, session: Session) -> int:
+    """Recomputes the monthly summary table from all transactions."""
+    for statement in MONTHLY_SUMMARY_REBUILD:
+        session.execute(text(statement))
+    session.commit()
+    return session.exec(select(func.count()).select_from(MonthlySummary)).one()
 
 
 def generate_monthly_report_data(
@@ -94,8 +40,6 @@ def generate_monthly_report_data(
     today = date.today()
     month_name = calendar.month_name[target_month]
     _, last_day = calendar.monthrange(target_year, target_month)
-    start_date = date(target_year, target_month, 1)
-    end_date = date(target_year, target_month, last_day)
 
     budget = session.exec(
         select(Budget).where(
@@ -104,16 +48,19 @@ def generate_monthly_report_data(
         )
     ).first()
 
-    transactions = session.exec(
-        select(Transaction).where(
-            Transaction.entry_date >= start_date,
-            Transaction.entry_date <= end_date,
+    total_spent = session.exec(
+        select(
+            func.coalesce(
+                func.sum(
+                    MonthlySummary.total_amount - MonthlySummary.self_transfer_amount
+                ),
+                0,
+            )
+        ).where(
+            MonthlySummary.year == target_year,
+            MonthlySummary.month == target_month,
         )
-    ).all()
-
-    relevant_transactions = [t for t in transactions if not _is_user(t.receiver)]
-
-    total_spent = sum(t.amount for t in relevant_transactions)
+    ).one()
 
     forecast = None
     is_current_month = (target_month == today.month) and (target_year == today.year)
@@ -146,41 +93,37 @@ def get_top_payees(
     by_count: bool = False,
 ) -> list[PayeeRankingItem]:
     """Ranks payees by total spending or transaction count."""
-    query = select(Transaction)
+    count = func.count()
+    total = func.sum(Transaction.amount)
+    query = (
+        select(func.coalesce(Payee.display_name, "Unknown"), count, total)
+        .select_from(Transaction)
+        .outerjoin(Payee, col(Payee.id) == col(Transaction.payee_id))
+        .where(col(Transaction.is_self_transfer).is_(False))
+    )
     if year:
         query = query.where(
             Transaction.entry_date >= date(year, 1, 1),
             Transaction.entry_date <= date(year, 12, 31),
         )
 
-    transactions = session.exec(query).all()
-    if not transactions:
-        return []
-
-    filtered_transactions = [t for t in transactions if not _is_user(t.receiver)]
-
-    grouped = defaultdict(list)
-    for t in filtered_transactions:
-        name = (t.receiver or "Unknown").strip() or "Unknown"
-        grouped[name].append(t.amount)
-
-    summary = []
-    for name, amounts in grouped.items():
-        total = sum(amounts)
-        count = len(amounts)
-        avg = int(total / count)
-        summary.append(PayeeRankingItem(name=name, count=count, total=total, avg=avg))
+    rows = session.exec(
+        query.group_by(col(Transaction.payee_id))
+        .order_by(desc(count if by_count else total))
+        .limit(limit)
+    ).all()
 
-    key_attr = "count" if by_count else "total"
-    summary.sort(key=lambda x: getattr(x, key_attr), reverse=True)
-    return summary[:limit]
+    return [
+        PayeeRankingItem(name=name, count=n, total=amount, avg=int(amount / n))
+        for name, n, amount in rows
+    ]
 
 
 def get_volatility_report_data(
     *, session: Session, year: int | None
 ) -> Optional[VolatilityReportData]:
     """Calculates spending volatility and identifies outliers."""
-    query = select(Transaction)
+    query = select(Transaction).where(col(Transaction.is_self_transfer).is_(False))
     if year:
         query = query.where(
             Transaction.entry_date >= date(year, 1, 1),
@@ -189,8 +132,6 @@ def get_volatility_report_data(
 
     transactions = session.exec(query.order_by(desc(Transaction.amount))).all()
 
-    transactions = [t for t in transactions if not _is_user(t.receiver)]
-
     # Minimum sample size of 10 is required to calculate a meaningful standard deviation and avoid flagging normal transactions as outliers in sparse datasets.
     if not transactions or len(transactions) < 10:
         return None
@@ -220,9 +161,9 @@ def get_volatility_report_data(
 
 def get_weekday_report_data(*, session: Session) -> list[WeekdayReportItem]:
     """Analyzes spending habits by day of the week."""
-    transactions = session.exec(select(Transaction)).all()
-
-    transactions = [t for t in transactions if not _is_user(t.receiver)]
+    transactions = session.exec(
+        select(Transaction).where(col(Transaction.is_self_transfer).is_(False))
+    ).all()
 
     if not transactions:
         return []
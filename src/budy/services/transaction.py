@@ -1,12 +1,95 @@
+import glob
+import hashlib
+import os
+import queue
+import threading
+import time
 from collections import defaultdict
-from datetime import date, timedelta
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, closing
+from datetime import date, datetime, timedelta
+from multiprocessing import get_all_start_methods, get_context
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 
-from sqlmodel import Session, asc, col, desc, or_, select
+from sqlalchemy import column, delete, literal_column, table, text, tuple_
+from sqlmodel import Session, asc, col, desc, func, or_, select
 
-from budy.config import settings
-from budy.importer import BaseBankImporter
-from budy.schemas import CategoryRule, Transaction
+from budy.camt import Camt053Importer
+from budy.config import BankConfig, Settings, settings
+from budy.database import begin_write
+from budy.identity import update_self_transfer_flags
+from budy.importer import SNIFF_SIZE, BankDetector, BaseBankImporter
+from budy.payees import intern_payees, normalize_payee
+from budy.rules import RuleMatcher
+from budy.schemas import (
+    MONTHLY_SUMMARY_DELETE_TRIGGER,
+    MONTHLY_SUMMARY_SUBTRACT_IMPORT,
+    TRANSACTION_SEARCH_DELETE_IMPORT,
+    TRANSACTION_SEARCH_DELETE_TRIGGER,
+    TRANSACTION_SEARCH_REBUILD,
+    ImportBatch,
+    ImportJournal,
+    ImportSummary,
+    Transaction,
+    TransactionPage,
+)
+from budy.services.category import get_rule_matcher
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Files picked up when importing a whole directory.
+_STATEMENT_SUFFIXES = {".csv", ".xml"}
+
+# Lightweight handle on the FTS5 search index, which is not a SQLModel table.
+_search_index = table("transaction_fts", column("rowid"))
+
+# Import batches are bulk-loaded into this scratch table (private to the
+# connection, without indexes or triggers) and moved over set-based.
+_STAGING_COLUMNS = [
+    "entry_date",
+    "amount",
+    "receiver",
+    "description",
+    "category_id",
+    "payee_id",
+    "is_self_transfer",
+    "dedup_key",
+    "import_batch_id",
+]
+_STAGING_LIST = ", ".join(_STAGING_COLUMNS)
+_CREATE_STAGING = f"CREATE TEMP TABLE IF NOT EXISTS import_staging ({_STAGING_LIST})"
+_INSERT_STAGING = (
+    f"INSERT INTO import_staging ({_STAGING_LIST}) "
+    f"VALUES ({', '.join('?' * len(_STAGING_COLUMNS))})"
+)
+_APPLY_PAYEE_CATEGORIES = """
+UPDATE import_staging
+SET category_id = (SELECT category_id FROM payee WHERE id = payee_id)
+WHERE category_id IS NULL AND payee_id IS NOT NULL
+"""
+_COUNT_DUPLICATES = """
+SELECT count(*) FROM import_staging AS s
+WHERE EXISTS (SELECT 1 FROM "transaction" AS t WHERE t.dedup_key = s.dedup_key)
+"""
+# "WHERE true" keeps SQLite from reading ON CONFLICT as part of the SELECT.
+_INSERT_STAGED = (
+    f'INSERT INTO "transaction" ({_STAGING_LIST}) '
+    f"SELECT {_STAGING_LIST} FROM import_staging WHERE true "
+    "ON CONFLICT (dedup_key) DO NOTHING"
+)
+
+
+def group_by_day(
+    transactions: list[Transaction],
+) -> list[tuple[date, list[Transaction]]]:
+    """Groups chronologically ordered transactions by date, skipping empty days."""
+    groups: dict[date, list[Transaction]] = {}
+    for t in transactions:
+        groups.setdefault(t.entry_date, []).append(t)
+    return list(groups.items())
 
 
 def get_transactions(
@@ -14,34 +97,122 @@ def get_transactions(
     session: Session,
     offset: int,
     limit: int,
+    sparse: bool = False,
 ) -> list[tuple[date, list[Transaction]]]:
     """
     Fetches transactions for a date range by offset and limit, grouped by date.
+    In sparse mode only days that have transactions are returned.
     """
     today = date.today()
 
-    oldest_date_in_range = today - timedelta(days=offset + limit - 1)
-    dates_to_show = [oldest_date_in_range + timedelta(days=i) for i in range(limit)]
-
-    min_date_query = dates_to_show[0]
-    max_date_query = dates_to_show[-1]
+    min_date_query = today - timedelta(days=offset + limit - 1)
+    max_date_query = today - timedelta(days=offset)
 
     transactions = list(
         session.exec(
             select(Transaction)
             .where(Transaction.entry_date >= min_date_query)
             .where(Transaction.entry_date <= max_date_query)
-            .order_by(asc(Transaction.entry_date))
+            .order_by(asc(Transaction.entry_date), asc(Transaction.id))
         ).all()
     )
 
+    if sparse:
+        return group_by_day(transactions)
+
     tx_map = defaultdict(list)
     for t in transactions:
         tx_map[t.entry_date].append(t)
 
+    dates_to_show = [min_date_query + timedelta(days=i) for i in range(limit)]
     return [(d, tx_map.get(d, [])) for d in dates_to_show]
 
 
+def _keyset_condition(session: Session, cursor: str, *, older: bool):
+    """
+    Builds the keyset predicate for a cursor: a transaction ID (exclusive)
+    or a YYYY-MM-DD date (exclusive of that whole day).
+    """
+    if cursor.isdigit():
+        anchor = session.get(Transaction, int(cursor))
+        if not anchor:
+            raise ValueError(f"Transaction #{cursor} not found.")
+
+        key = tuple_(col(Transaction.entry_date), col(Transaction.id))
+        bound = tuple_(anchor.entry_date, anchor.id)
+        return key < bound if older else key > bound
+
+    try:
+        day = date.fromisoformat(cursor)
+    except ValueError:
+        raise ValueError(
+            f"Invalid cursor '{cursor}'. Use a transaction ID or a YYYY-MM-DD date."
+        ) from None
+
+    return (
+        col(Transaction.entry_date) < day
+        if older
+        else col(Transaction.entry_date) > day
+    )
+
+
+def get_transaction_page(
+    *,
+    session: Session,
+    page_size: int,
+    before: str | None = None,
+    after: str | None = None,
+) -> TransactionPage:
+    """
+    Fetches a page of transactions using keyset pagination over (entry_date, id).
+    Without a cursor the newest page is returned. Each page costs one index seek,
+    regardless of how deep into the history it is.
+    """
+    if before and after:
+        raise ValueError("Use either --before or --after, not both.")
+
+    key_order = (col(Transaction.entry_date), col(Transaction.id))
+    older = after is None
+    stmt = select(Transaction)
+
+    if before or after:
+        stmt = stmt.where(
+            _keyset_condition(session, before or after or "", older=older)
+        )
+
+    if older:
+        stmt = stmt.order_by(*(desc(c) for c in key_order))
+    else:
+        stmt = stmt.order_by(*(asc(c) for c in key_order))
+
+    rows = list(session.exec(stmt.limit(page_size + 1)).all())
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if older:
+        rows.reverse()
+
+    if not rows:
+        return TransactionPage(transactions=[])
+
+    def _has_rows_beyond(anchor: Transaction, *, older: bool) -> bool:
+        condition = _keyset_condition(session, str(anchor.id), older=older)
+        stmt = select(Transaction.id).where(condition).limit(1)
+        return session.exec(stmt).first() is not None
+
+    oldest, newest = rows[0], rows[-1]
+    if older:
+        has_older, has_newer = has_more, _has_rows_beyond(newest, older=False)
+    else:
+        has_older, has_newer = _has_rows_beyond(oldest, older=True), has_more
+
+    return TransactionPage(
+        transactions=rows,
+        older_cursor=oldest.id if has_older else None,
+        newer_cursor=newest.id if has_newer else None,
+    )
+
+
 def create_transaction(
     *,
     session: Session,
@@ -106,57 +277,744 @@ def delete_transaction(*, session: Session, transaction_id: int) -> bool:
     return True
 
 
-def import_transactions(
+def _prefetch[T](items: Iterator[T], depth: int = 2) -> Iterator[T]:
+    """
+    Produces items in a background thread, at most `depth` ahead of the consumer,
+    so that parsing the next batch overlaps writing the current one.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: object) -> bool:
+        # Gives up once the consumer has stopped reading.
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(done)
+        except BaseException as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while (item := buffer.get()) is not done:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
+
+
+def _init_import_worker(settings_data: dict) -> None:
+    # Workers may not be forked from this process; use the caller's settings,
+    # which decide e.g. who counts as the owner for self-transfers.
+    loaded = Settings(**settings_data)
+    for field in Settings.model_fields:
+        setattr(settings, field, getattr(loaded, field))
+
+
+def _get_importer(bank_config: BankConfig) -> BaseBankImporter:
+    if bank_config.format == "camt053":
+        return Camt053Importer()
+    return BaseBankImporter(**bank_config.model_dump())
+
+
+def _parse_file(
+    bank_config: BankConfig, file_path: Path, matcher: RuleMatcher
+) -> "pl.DataFrame | None":
+    """
+    Parses and categorizes a statement in batches, as a single-file import
+    does; runs in an import worker process. Returns None if it has no rows.
+    """
+    import polars as pl
+
+    importer = _get_importer(bank_config)
+    with open(file_path, "rb") as binary:
+        frames = list(
+            importer.iter_batches(binary, settings.imports.batch_size, rules=matcher)
+        )
+    return pl.concat(frames) if frames else None
+
+
+def _drop_invalid(summary: ImportSummary, frame: "pl.DataFrame") -> "pl.DataFrame":
+    """Counts and removes the rows the importer could not parse."""
+    import polars as pl
+
+    valid = pl.col("entry_date").is_not_null() & pl.col("amount").is_not_null()
+    valid_rows = frame.filter(valid)
+    summary.invalid += frame.height - valid_rows.height
+    return valid_rows
+
+
+def _add_to_summary(summary: ImportSummary, frame: "pl.DataFrame") -> None:
+    first_date, last_date = frame["entry_date"].min(), frame["entry_date"].max()
+    summary.count += frame.height
+    summary.total_amount += frame["amount"].sum()
+    summary.first_date = min(filter(None, [summary.first_date, first_date]))
+    summary.last_date = max(filter(None, [summary.last_date, last_date]))
+
+
+def _get_bank_config(bank_name: str) -> BankConfig:
+    bank_config = settings.banks.get(bank_name.lower())
+
+    if not bank_config:
+        available = ", ".join(settings.banks.keys())
+        raise ValueError(f"Unknown bank '{bank_name}'. Available banks: {available}")
+
+    return bank_config
+
+
+def _read_head(source: Path | BinaryIO) -> bytes:
+    """Returns the first bytes of a statement without consuming the stream."""
+    if isinstance(source, Path):
+        with open(source, "rb") as f:
+            return f.read(SNIFF_SIZE)
+    if source.seekable():
+        position = source.tell()
+        head = source.read(SNIFF_SIZE)
+        source.seek(position)
+        return head
+    if peek := getattr(source, "peek", None):
+        return peek(SNIFF_SIZE)[:SNIFF_SIZE]
+    raise ValueError("Cannot detect the bank of this stream. Use --bank.")
+
+
+def detect_bank(source: Path | BinaryIO, detector: BankDetector | None = None) -> str:
+    """Picks the configured bank whose columns match the statement's header."""
+    detector = detector or BankDetector(settings.banks)
+    bank_name = detector.detect(_read_head(source))
+    if not bank_name:
+        name = source.name if isinstance(source, Path) else "the input"
+        raise ValueError(f"Could not detect the bank of {name}. Use --bank.")
+    return bank_name
+
+
+def _file_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _open_journal(
     *,
     session: Session,
+    path: Path,
     bank_name: str,
-    file_path: Path,
+    resume: bool,
+    file_hash: str | None = None,
+) -> tuple[ImportJournal, int]:
+    """
+    Finds or starts the journal of a statement file. Returns it and the number
+    of rows an interrupted import already committed, which a resume skips.
+    """
+    file_hash = file_hash or _file_hash(path)
+    journal = session.exec(
+        select(ImportJournal).where(ImportJournal.file_hash == file_hash)
+    ).first()
+    if journal and resume and journal.bank == bank_name:
+        return journal, journal.rows_committed
+
+    journal = journal or ImportJournal(file_hash=file_hash, file_name="", bank="")
+    journal.file_name = path.name
+    journal.bank = bank_name
+    journal.rows_committed = journal.batches_committed = 0
+    journal.completed = False
+    journal.updated_at = datetime.now()
+    session.add(journal)
+    session.commit()
+    return journal, 0
+
+
+def _open_batch(
+    *,
+    session: Session,
+    file_name: str,
+    bank_name: str,
+    journal: ImportJournal | None,
+    skip: int,
+) -> ImportBatch:
+    """Starts the import batch of a statement; a resumed import continues its own."""
+    file_hash = journal.file_hash if journal else None
+    if file_hash and skip:
+        batch = session.exec(
+            select(ImportBatch)
+            .where(ImportBatch.file_hash == file_hash)
+            .order_by(desc(ImportBatch.id))
+        ).first()
+        if batch:
+            return batch
+
+    batch = ImportBatch(file_name=file_name, file_hash=file_hash, bank=bank_name)
+    session.add(batch)
+    session.commit()
+    return batch
+
+
+def _finish_import(
+    *,
+    session: Session,
+    journal: ImportJournal | None,
+    batch: ImportBatch | None,
+) -> None:
+    if journal:
+        journal.completed = True
+        journal.updated_at = datetime.now()
+        session.add(journal)
+    if batch and not batch.row_count:
+        # Nothing new was imported, so there is nothing to roll back.
+        session.delete(batch)
+    session.commit()
+
+
+def _write_rows(
+    *,
+    session: Session,
+    frame: "pl.DataFrame",
+    summary: ImportSummary,
+    journal: ImportJournal | None,
+    batch: ImportBatch | None,
+    skip: int,
+    dry_run: bool = False,
+) -> int:
+    """
+    Writes valid rows in committed batches. The first `skip` rows were
+    committed by an interrupted import and are passed over. Returns how many
+    rows are still to be passed over. A dry run only counts the duplicates.
+    """
+    skipped = min(skip, frame.height)
+    summary.skipped += skipped
+    for rows in frame.slice(skipped).iter_slices(settings.imports.batch_size):
+        if dry_run:
+            summary.skipped += _count_duplicates(session=session, frame=rows)
+            continue
+        inserted = _write_batch(
+            session=session,
+            frame=rows,
+            journal=journal,
+            import_batch=batch,
+        )
+        summary.skipped += rows.height - inserted
+    return skip - skipped
+
+
+def _stage_batch(
+    *, session: Session, frame: "pl.DataFrame", import_batch_id: int | None = None
+) -> None:
+    """Bulk-loads one batch into the empty staging table."""
+    import polars as pl
+
+    conn = session.connection()
+    conn.exec_driver_sql(_CREATE_STAGING)
+    conn.exec_driver_sql("DELETE FROM import_staging")
+
+    if "payee_id" not in frame.columns:
+        frame = frame.with_columns(pl.lit(None, dtype=pl.Int64).alias("payee_id"))
+    frame = frame.with_columns(
+        pl.col("entry_date").cast(pl.String),
+        pl.lit(import_batch_id, dtype=pl.Int64).alias("import_batch_id"),
+    ).select(_STAGING_COLUMNS)
+
+    # Plain tuples through the driver: the staging table has no types,
+    # indexes or triggers, so loading it costs little more than the binding.
+    for chunk in frame.iter_slices(settings.imports.chunk_size):
+        conn.exec_driver_sql(_INSERT_STAGING, chunk.rows())
+
+
+def _count_duplicates(*, session: Session, frame: "pl.DataFrame") -> int:
+    """Counts the rows of a batch that were imported before, writing nothing."""
+    try:
+        _stage_batch(session=session, frame=frame)
+        return session.connection().exec_driver_sql(_COUNT_DUPLICATES).scalar_one()
+    finally:
+        session.rollback()
+
+
+def _write_batch(
+    *,
+    session: Session,
+    frame: "pl.DataFrame",
+    journal: ImportJournal | None = None,
+    import_batch: ImportBatch | None = None,
+) -> int:
+    """
+    Inserts one batch of parsed, categorized rows. Returns the rows inserted.
+    The batch is staged first and moved over with set-based statements; the
+    journal's progress and the import batch's row count are committed together
+    with the rows.
+    """
+    import polars as pl
+
+    # Intern receivers once per batch instead of once per row.
+    receivers = frame["receiver"].drop_nulls().unique().to_list()
+    payee_ids = intern_payees(session.connection(), receivers)
+    receiver_payees = {r: payee_ids.get(normalize_payee(r)) for r in receivers}
+    payee_id = pl.col("receiver").replace_strict(
+        receiver_payees, default=None, return_dtype=pl.Int64
+    )
+    frame = frame.with_columns(payee_id.alias("payee_id"))
+    _stage_batch(
+        session=session,
+        frame=frame,
+        import_batch_id=import_batch.id if import_batch else None,
+    )
+
+    # Rows no rule matched fall back to their payee's default category.
+    # Derived data (search index, summaries) is maintained by triggers, and the
+    # unique dedup_key index makes SQLite skip rows that were imported before.
+    conn = session.connection()
+    conn.exec_driver_sql(_APPLY_PAYEE_CATEGORIES)
+    inserted = conn.exec_driver_sql(_INSERT_STAGED).rowcount
+
+    if journal:
+        journal.rows_committed += frame.height
+        journal.batches_committed += 1
+        journal.updated_at = datetime.now()
+        session.add(journal)
+    if import_batch:
+        import_batch.row_count += inserted
+        session.add(import_batch)
+    session.commit()
+    return inserted
+
+
+def import_transactions(
+    *,
+    session: Session,
+    bank_name: str | None,
+    source: Path | BinaryIO,
     dry_run: bool,
-) -> list[Transaction]:
-    """Imports transactions from a bank CSV file."""
-    bank_name_key = bank_name.lower()
-    bank_config = settings.banks.get(bank_name_key)
+    resume: bool = False,
+    on_progress: Callable[[ImportSummary], None] | None = None,
+    file_hash: str | None = None,
+) -> ImportSummary:
+    """
+    Imports transactions from a bank statement file or binary stream (e.g. stdin).
+    Without a bank name, the bank is detected from the header row.
+    The statement is parsed and written in batches, each committed on its own
+    together with the file's journal entry. With `resume`, the batches an
+    interrupted import of the same file committed are not written again.
+    A caller that already hashed the file passes `file_hash` to save a read.
+    """
+    if isinstance(source, Path) and not source.exists():
+        raise FileNotFoundError(f"File not found: {source}")
 
-    if not bank_config:
-        available = ", ".join(settings.banks.keys())
-        raise ValueError(f"Unknown bank '{bank_name}'. Available banks: {available}")
+    bank_name = (bank_name or detect_bank(source)).lower()
+    bank_config = _get_bank_config(bank_name)
+    importer = _get_importer(bank_config)
+    matcher = get_rule_matcher(session=session)
+    summary = ImportSummary(banks=[bank_name])
+
+    journal, batch, skip = None, None, 0
+    if isinstance(source, Path) and not dry_run:
+        journal, skip = _open_journal(
+            session=session,
+            path=source,
+            bank_name=bank_name,
+            resume=resume,
+            file_hash=file_hash,
+        )
+    if not dry_run:
+        batch = _open_batch(
+            session=session,
+            file_name=source.name if isinstance(source, Path) else "<stdin>",
+            bank_name=bank_name,
+            journal=journal,
+            skip=skip,
+        )
+
+    with ExitStack() as stack:
+        if isinstance(source, Path):
+            binary = stack.enter_context(open(source, "rb"))
+        else:
+            binary = source
+
+        # Closed in reverse: the prefetch thread stops before the parser is
+        # closed, which leaves a caller's stream (e.g. stdin) open.
+        batches = stack.enter_context(
+            closing(
+                importer.iter_batches(
+                    binary, settings.imports.batch_size, rules=matcher
+                )
+            )
+        )
+        for frame in stack.enter_context(closing(_prefetch(batches))):
+            frame = _drop_invalid(summary, frame)
+            if frame.is_empty():
+                continue
+
+            _add_to_summary(summary, frame)
+            skip = _write_rows(
+                session=session,
+                frame=frame,
+                summary=summary,
+                journal=journal,
+                batch=batch,
+                skip=skip,
+                dry_run=dry_run,
+            )
+
+            if on_progress:
+                on_progress(summary)
+
+    _finish_import(session=session, journal=journal, batch=batch)
+    return summary
+
+
+def resolve_import_paths(patterns: list[Path]) -> list[Path]:
+    """Expands directories (to the statements inside) and glob patterns into files."""
+    files: dict[Path, None] = {}
+    for pattern in patterns:
+        if pattern.is_dir():
+            matches = [
+                p
+                for p in pattern.rglob("*")
+                if p.suffix.lower() in _STATEMENT_SUFFIXES and p.is_file()
+            ]
+        elif any(c in str(pattern) for c in "*?["):
+            matches = [Path(p) for p in glob.glob(str(pattern), recursive=True)]
+            matches = [p for p in matches if p.is_file()]
+            if not matches:
+                raise ValueError(f"No files match '{pattern}'.")
+        elif pattern.is_file():
+            matches = [pattern]
+        else:
+            raise ValueError(f"File not found: {pattern}")
+
+        files.update((p.resolve(), None) for p in sorted(matches))
+
+    return list(files)
+
+
+def import_files(
+    *,
+    session: Session,
+    bank_name: str | None,
+    file_paths: list[Path],
+    dry_run: bool,
+    resume: bool = False,
+    on_progress: Callable[[ImportSummary], None] | None = None,
+    file_hashes: dict[Path, str] | None = None,
+) -> ImportSummary:
+    """
+    Imports many statements at once. Files are parsed and categorized in a
+    process pool and written by this process, one committed batch at a time.
+    Without a bank name, each file's bank is detected from its header row,
+    so a folder may mix statements from several banks. `file_hashes` holds
+    content hashes the caller already computed.
+    """
+    file_hashes = file_hashes or {}
+    if len(file_paths) == 1:
+        return import_transactions(
+            session=session,
+            bank_name=bank_name,
+            source=file_paths[0],
+            dry_run=dry_run,
+            resume=resume,
+            on_progress=on_progress,
+            file_hash=file_hashes.get(file_paths[0]),
+        )
 
-    importer = BaseBankImporter(**bank_config.model_dump())
+    # Detect every file up front, so an unknown file fails before any import.
+    detector = BankDetector(settings.banks)
+    file_banks = {
+        path: (bank_name or detect_bank(path, detector)).lower() for path in file_paths
+    }
+    bank_configs = {bank: _get_bank_config(bank) for bank in file_banks.values()}
+    matcher = get_rule_matcher(session=session)
+    summary = ImportSummary(banks=sorted(bank_configs))
+    workers = min(len(file_paths), settings.imports.workers or os.cpu_count() or 1)
 
-    transactions = importer.process_file(file_path)
+    # Forking a process that runs polars' thread pool can deadlock the children.
+    method = "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context(method),
+        initializer=_init_import_worker,
+        initargs=(settings.model_dump(),),
+    ) as pool:
+        futures = {
+            pool.submit(_parse_file, bank_configs[bank], file_path, matcher): (
+                file_path,
+                bank,
+            )
+            for file_path, bank in file_banks.items()
+        }
+        try:
+            # Files are written as they finish; dedup keys do not depend on order.
+            for future in as_completed(futures):
+                file_path, bank = futures[future]
+                frame = future.result()
+                if frame is not None:
+                    frame = _drop_invalid(summary, frame)
+
+                # Statements without rows are journaled too, so they count as done.
+                journal, batch, skip = None, None, 0
+                if not dry_run:
+                    journal, skip = _open_journal(
+                        session=session,
+                        path=file_path,
+                        bank_name=bank,
+                        resume=resume,
+                        file_hash=file_hashes.get(file_path),
+                    )
+                    batch = _open_batch(
+                        session=session,
+                        file_name=file_path.name,
+                        bank_name=bank,
+                        journal=journal,
+                        skip=skip,
+                    )
+                if frame is not None and not frame.is_empty():
+                    _add_to_summary(summary, frame)
+                    _write_rows(
+                        session=session,
+                        frame=frame,
+                        summary=summary,
+                        journal=journal,
+                        batch=batch,
+                        skip=skip,
+                        dry_run=dry_run,
+                    )
+                _finish_import(session=session, journal=journal, batch=batch)
+
+                if on_progress:
+                    on_progress(summary)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return summary
 
-    # Apply auto-categorization rules
-    rules = session.exec(select(CategoryRule)).all()
-    for txn in transactions:
-        # Combine receiver and description for matching
-        text_to_match = f"{txn.receiver or ''} {txn.description or ''}".lower()
 
-        for rule in rules:
-            if rule.pattern in text_to_match:
-                txn.category_id = rule.category_id
-                break
+def find_new_statements(
+    *,
+    session: Session,
+    directory: Path,
+    seen: dict[Path, tuple[int, int]],
+    settle: float = 0,
+) -> dict[Path, str]:
+    """
+    Returns the statements in a folder that have not been imported yet, with
+    their content hashes.
+    `seen` carries each file's size and modification time between calls, and
+    only files whose stat changed are hashed and looked up in the import
+    journal, so polling an idle folder costs one stat per file. Files modified
+    in the last `settle` seconds may still be being written and are left for
+    a later call. Returned files are only added to `seen` by mark_seen, once
+    they imported, so a file that fails is tried again.
+    """
+    now = time.time()
+    present: set[Path] = set()
+    changed: dict[Path, tuple[int, int]] = {}
+    for path in resolve_import_paths([directory]):
+        present.add(path)
+        stat = path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        if seen.get(path) == key or now - stat.st_mtime < settle:
+            continue
+        changed[path] = key
+
+    for path in seen.keys() - present:
+        del seen[path]
+    if not changed:
+        return {}
+
+    hashes = {path: _file_hash(path) for path in changed}
+    imported = set(
+        session.exec(
+            select(ImportJournal.file_hash).where(
+                col(ImportJournal.file_hash).in_(hashes.values()),
+                col(ImportJournal.completed),
+            )
+        ).all()
+    )
+    new = {}
+    for path, file_hash in hashes.items():
+        if file_hash in imported:
+            seen[path] = changed[path]
+        else:
+            new[path] = file_hash
+    return new
+
+
+def mark_seen(seen: dict[Path, tuple[int, int]], paths: Iterable[Path]) -> None:
+    """Records imported statements; find_new_statements skips them until changed."""
+    for path in paths:
+        stat = path.stat()
+        seen[path] = (stat.st_size, stat.st_mtime_ns)
+
+
+def _merge_summary(summary: ImportSummary, other: ImportSummary) -> None:
+    summary.count += other.count
+    summary.skipped += other.skipped
+    summary.invalid += other.invalid
+    summary.total_amount += other.total_amount
+    summary.banks = sorted({*summary.banks, *other.banks})
+    dates = [summary.first_date, summary.last_date, other.first_date, other.last_date]
+    summary.first_date = min(filter(None, dates), default=None)
+    summary.last_date = max(filter(None, dates), default=None)
+
+
+def import_new_statements(
+    *, session: Session, bank_name: str | None, file_hashes: dict[Path, str]
+) -> tuple[ImportSummary, dict[Path, str]]:
+    """
+    Imports statements picked up from a watched folder, given with their
+    content hashes. Files of one bank are imported together, so a backlog is
+    parsed in parallel; a file whose bank cannot be detected or that fails to
+    import is reported and does not hold up the others. Returns the summary
+    and the error of every file that failed.
+    """
+    failures: dict[Path, str] = {}
+    by_bank: dict[str, list[Path]] = defaultdict(list)
+    detector = BankDetector(settings.banks)
+    for path in file_hashes:
+        try:
+            by_bank[bank_name or detect_bank(path, detector)].append(path)
+        except ValueError as e:
+            failures[path] = str(e)
+
+    summary = ImportSummary()
+    for bank, file_paths in by_bank.items():
+        try:
+            # Resuming lets a file whose import was interrupted continue.
+            result = import_files(
+                session=session,
+                bank_name=bank,
+                file_paths=file_paths,
+                dry_run=False,
+                resume=True,
+                file_hashes=file_hashes,
+            )
+            _merge_summary(summary, result)
+            continue
+        except Exception:
+            session.rollback()
+
+        # Committed batches are not written again, so retrying file by file
+        # is safe.
+        for path in file_paths:
+            try:
+                result = import_transactions(
+                    session=session,
+                    bank_name=bank,
+                    source=path,
+                    dry_run=False,
+                    resume=True,
+                    file_hash=file_hashes[path],
+                )
+            except Exception as e:
+                session.rollback()
+                failures[path] = str(e)
+                continue
+            _merge_summary(summary, result)
+    return summary, failures
 
-    if not dry_run and transactions:
-        session.add_all(transactions)
-        session.commit()
 
-    return transactions
+def get_import_batches(*, session: Session) -> list[ImportBatch]:
+    """Returns the imports that can be rolled back, newest first."""
+    return list(session.exec(select(ImportBatch).order_by(desc(ImportBatch.id))).all())
+
+
+def rollback_import(*, session: Session, import_batch_id: int) -> int | None:
+    """
+    Deletes every transaction an import added, in one statement served by the
+    import_batch_id index. The summaries and the search index lose the
+    import's rows in one pass each, all in the same transaction.
+    Returns the number of rows removed, or None if there is no such import.
+    """
+    begin_write(session.connection())
+    batch = session.get(ImportBatch, import_batch_id)
+    if not batch:
+        return None
+
+    # Set-based cleanup instead of the delete triggers firing once per row.
+    session.execute(text("DROP TRIGGER monthlysummary_delete"))
+    session.execute(text("DROP TRIGGER transaction_fts_delete"))
+    params = {"import_batch_id": batch.id}
+    for statement in MONTHLY_SUMMARY_SUBTRACT_IMPORT:
+        session.execute(text(statement), params)
+    session.execute(text(TRANSACTION_SEARCH_DELETE_IMPORT), params)
+    removed = session.execute(
+        delete(Transaction).where(col(Transaction.import_batch_id) == batch.id)
+    ).rowcount
+    session.execute(text(MONTHLY_SUMMARY_DELETE_TRIGGER))
+    session.execute(text(TRANSACTION_SEARCH_DELETE_TRIGGER))
+    if batch.file_hash:
+        # Forget the file's progress, so importing it again starts from scratch.
+        session.execute(
+            delete(ImportJournal).where(col(ImportJournal.file_hash) == batch.file_hash)
+        )
+    session.delete(batch)
+    session.commit()
+    return removed
+
+
+def _search_match_query(query: str) -> str:
+    """Turns free text into an FTS5 query that prefix-matches every word."""
+    terms = query.split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
 
 
 def search_transactions(
-    *, session: Session, query: str, limit: int
+    *, session: Session, query: str, limit: int, substring: bool = False
 ) -> list[Transaction]:
-    """Search for transactions by receiver or description keyword."""
-    pattern = f"%{query}%"
-    stmt = (
-        select(Transaction)
-        .where(
-            or_(
-                col(Transaction.receiver).ilike(pattern),
-                col(Transaction.description).ilike(pattern),
+    """
+    Search for transactions by receiver or description keyword.
+    Uses the full-text index, best matches first. With `substring`, scans
+    every row for the text instead, which also finds fragments inside a word.
+    """
+    if substring:
+        pattern = f"%{query}%"
+        stmt = (
+            select(Transaction)
+            .where(
+                or_(
+                    col(Transaction.receiver).ilike(pattern),
+                    col(Transaction.description).ilike(pattern),
+                )
             )
+            .order_by(desc(Transaction.entry_date))
+            .limit(limit)
         )
-        .order_by(desc(Transaction.entry_date))
+        return list(session.exec(stmt).all())
+
+    match_query = _search_match_query(query)
+    if not match_query:
+        return []
+    index_table = literal_column("transaction_fts")
+    stmt = (
+        select(Transaction)
+        .join(_search_index, _search_index.c.rowid == Transaction.id)
+        .where(index_table.op("MATCH")(match_query))
+        .order_by(func.bm25(index_table), desc(Transaction.entry_date))
         .limit(limit)
     )
     return list(session.exec(stmt).all())
+
+
+def rebuild_search_index(*, session: Session) -> int:
+    """Rebuilds the full-text search index from the transaction table."""
+    for statement in TRANSACTION_SEARCH_REBUILD:
+        session.execute(text(statement))
+    session.commit()
+    return session.exec(select(func.count()).select_from(Transaction)).one()
+
+
+def recompute_self_transfers(*, session: Session) -> int:
+    """Re-flags transfers to the user's own accounts, e.g. after a name change."""
+    count = update_self_transfer_flags(session.connection())
+    session.commit()
+    return count
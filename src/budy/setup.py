@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from typing import Annotated, Optional
 
@@ -8,7 +9,7 @@ from typer import Exit, Option, get_app_dir
 
 from budy.config import APP_NAME, BankConfig, Settings, settings
 from budy.database import engine
-from budy.services.transaction import import_transactions
+from budy.services.transaction import import_transactions, recompute_self_transfers
 from budy.views.messages import render_error
 from budy.views.transaction import render_import_summary
 
@@ -85,10 +86,15 @@ def run_setup(
         currency = Prompt.ask("Enter currency symbol")
 
     # 4. Prepare Settings
+    # Extra identities and database tuning are not asked for interactively;
+    # keep what is in effect.
     defaults = Settings(
         first_name=first_name,
         last_name=last_name,
         currency_symbol=currency,
+        identity=settings.identity,
+        imports=settings.imports,
+        database=settings.database,
     )
 
     if imported_banks:
@@ -97,6 +103,11 @@ def run_setup(
     # 5. Save Configuration
     save_config(config_path, defaults)
 
+    name_changed = (settings.first_name, settings.last_name) != (
+        defaults.first_name,
+        defaults.last_name,
+    )
+
     # Update global settings in memory so imports work immediately without reload
     settings.first_name = defaults.first_name
     settings.last_name = defaults.last_name
@@ -104,6 +115,11 @@ def run_setup(
     settings.banks = defaults.banks
 
     console.print(f"\n[green]✓ Configuration saved to {config_path}[/]")
+
+    # Self-transfers are flagged by name when stored, so re-flag existing rows.
+    if name_changed:
+        with Session(engine) as session:
+            recompute_self_transfers(session=session)
     console.print(
         f"\nWelcome, [bold cyan]{first_name} {last_name}[/]! You are all set."
     )
@@ -126,12 +142,38 @@ currency_symbol = "{settings_obj.currency_symbol}"
 first_name = "{settings_obj.first_name}"
 last_name = "{settings_obj.last_name}"
 
+# Other Identities (transfers to these are not counted as spending)
+[identity]
+aliases = {json.dumps(settings_obj.identity.aliases, ensure_ascii=False)}
+household = {json.dumps(settings_obj.identity.household, ensure_ascii=False)}
+ibans = {json.dumps(settings_obj.identity.ibans, ensure_ascii=False)}
+
+# Import Settings
+[imports]
+batch_size = {settings_obj.imports.batch_size}
+chunk_size = {settings_obj.imports.chunk_size}
+workers = {settings_obj.imports.workers}
+
+# SQLite Performance Settings
+[database]
+journal_mode = "{settings_obj.database.journal_mode}"
+synchronous = "{settings_obj.database.synchronous}"
+cache_size = {settings_obj.database.cache_size}
+mmap_size = {settings_obj.database.mmap_size}
+temp_store = "{settings_obj.database.temp_store}"
+busy_timeout = {settings_obj.database.busy_timeout}
+
 # Bank Configurations
 """
     for bank_key, bank_config in settings_obj.banks.items():
         toml_content += f"\n[banks.{bank_key}]\n"
+        if bank_config.format != "csv":
+            toml_content += f'format = "{bank_config.format}"\n'
+            continue
         toml_content += f'delimiter = "{bank_config.delimiter}"\n'
         toml_content += f'decimal = "{bank_config.decimal}"\n'
+        if bank_config.thousands:
+            toml_content += f'thousands = "{bank_config.thousands}"\n'
         toml_content += f'encoding = "{bank_config.encoding}"\n'
         toml_content += f'date_col = "{bank_config.date_col}"\n'
         toml_content += f'amount_col = "{bank_config.amount_col}"\n'
@@ -142,6 +184,16 @@ last_name = "{settings_obj.last_name}"
             toml_content += f'receiver_col = "{bank_config.receiver_col}"\n'
         if bank_config.description_col:
             toml_content += f'description_col = "{bank_config.description_col}"\n'
+        if bank_config.reference_col:
+            toml_content += f'reference_col = "{bank_config.reference_col}"\n'
+        if bank_config.date_format:
+            toml_content += f'date_format = "{bank_config.date_format}"\n'
+        if bank_config.dtypes:
+            dtypes = ", ".join(
+                f"{json.dumps(column, ensure_ascii=False)} = {json.dumps(dtype)}"
+                for column, dtype in bank_config.dtypes.items()
+            )
+            toml_content += f"dtypes = {{ {dtypes} }}\n"
 
     with open(path, "w", encoding="utf-8") as f:
         f.write(toml_content)
@@ -237,15 +289,15 @@ debit_value = "D"
         console.print(f"\nImporting from [cyan]{selected_bank_name}[/]...")
         try:
             with Session(engine) as session:
-                transactions = import_transactions(
+                summary = import_transactions(
                     session=session,
                     bank_name=selected_bank_name,
-                    file_path=file_path,
+                    source=file_path,
                     dry_run=False,
                 )
                 console.print(
                     render_import_summary(
-                        transactions=transactions,
+                        summary=summary,
                         filename=file_path.name,
                         dry_run=False,
                     )
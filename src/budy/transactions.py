@@ -1,18 +1,30 @@
+import sys
+import time
 from datetime import date, datetime
 from pathlib import Path
 from typing import Annotated, Optional
 
 from rich.console import Console
 from sqlmodel import Session
-from typer import Argument, Exit, Option, Typer, confirm
+from typer import Argument, Exit, Option, Typer, confirm, prompt
 
 from budy.config import settings
 from budy.database import engine
+from budy.schemas import ImportSummary
 from budy.services.transaction import (
     create_transaction,
     delete_transaction,
+    find_new_statements,
+    get_import_batches,
+    get_transaction_page,
     get_transactions,
+    group_by_day,
+    import_files,
+    import_new_statements,
     import_transactions,
+    mark_seen,
+    resolve_import_paths,
+    rollback_import,
     update_transaction,
 )
 from budy.services.export import export_transactions
@@ -22,11 +34,17 @@ from budy.views.messages import (
     render_warning,
 )
 from budy.views.transaction import (
+    render_import_batch_list,
     render_import_summary,
+    render_page_navigation,
     render_transaction_list,
 )
 
 app = Typer(no_args_is_help=True)
+imports_app = Typer(
+    name="imports", help="Review and roll back imports.", no_args_is_help=True
+)
+app.add_typer(imports_app)
 console = Console()
 
 
@@ -88,7 +106,7 @@ def read_transactions(
         Option(
             "--offset",
             "-o",
-            help="Skip the first N entries.",
+            help="Skip the first N days.",
         ),
     ] = 0,
     limit: Annotated[
@@ -96,13 +114,50 @@ def read_transactions(
         Option(
             "--limit",
             "-l",
-            help="Limit the number of entries shown.",
+            help="Limit the number of days shown.",
         ),
     ] = 7,
+    sparse: Annotated[
+        bool,
+        Option(
+            "--sparse",
+            "-s",
+            help="Only show days that have transactions.",
+        ),
+    ] = False,
+    before: Annotated[
+        Optional[str],
+        Option(
+            "--before",
+            help="Page through transactions older than this ID or date (YYYY-MM-DD).",
+        ),
+    ] = None,
+    after: Annotated[
+        Optional[str],
+        Option(
+            "--after",
+            help="Page through transactions newer than this ID or date (YYYY-MM-DD).",
+        ),
+    ] = None,
+    page_size: Annotated[
+        Optional[int],
+        Option(
+            "--page-size",
+            "-n",
+            min=1,
+            help="Page through history N transactions at a time.",
+        ),
+    ] = None,
 ) -> None:
     """Display transaction history in a table."""
+    if before or after or page_size:
+        show_transaction_page(before=before, after=after, page_size=page_size or 20)
+        return
+
     with Session(engine) as session:
-        transactions = get_transactions(session=session, offset=offset, limit=limit)
+        transactions = get_transactions(
+            session=session, offset=offset, limit=limit, sparse=sparse
+        )
 
     if not transactions:
         console.print(
@@ -113,6 +168,35 @@ def read_transactions(
     console.print(render_transaction_list(daily_transactions=transactions))
 
 
+def show_transaction_page(
+    *, before: str | None, after: str | None, page_size: int
+) -> None:
+    """Displays one keyset-paginated page of transactions."""
+    try:
+        with Session(engine) as session:
+            page = get_transaction_page(
+                session=session, page_size=page_size, before=before, after=after
+            )
+    except ValueError as e:
+        console.print(render_error(message=str(e)))
+        raise Exit(1)
+
+    if not page.transactions:
+        console.print(render_warning(message="No transactions found."))
+        return
+
+    console.print(
+        render_transaction_list(daily_transactions=group_by_day(page.transactions))
+    )
+    console.print(
+        render_page_navigation(
+            older_cursor=page.older_cursor,
+            newer_cursor=page.newer_cursor,
+            page_size=page_size,
+        )
+    )
+
+
 @app.command(name="update")
 def update_txn(
     transaction_id: Annotated[int, Argument(help="ID of the transaction to update.")],
@@ -264,54 +348,100 @@ def get_bank_names(incomplete: str):
 @app.command(name="import")
 def run_import(
     bank: Annotated[
-        str,
+        Optional[str],
         Option(
             "--bank",
             "-b",
-            prompt=True,
-            help="The bank to import from (defined in config).",
+            help="The bank to import from (defined in config). "
+            "Detected from the file headers if omitted.",
             autocompletion=get_bank_names,
         ),
-    ],
+    ] = None,
+    paths: Annotated[
+        Optional[list[Path]],
+        Argument(
+            help="More statement files, directories or glob patterns to import.",
+            show_default=False,
+        ),
+    ] = None,
     file_path: Annotated[
-        Path,
+        Optional[Path],
         Option(
             "--file",
             "-f",
-            exists=True,
-            file_okay=True,
-            dir_okay=False,
-            readable=True,
-            resolve_path=True,
-            prompt=True,
-            help="Path to the CSV file.",
+            allow_dash=True,
+            help="Path to the statement file, or '-' to read from stdin.",
         ),
-    ],
+    ] = None,
     dry_run: Annotated[
         bool,
         Option(
-            help="Parse the file but do not save to the database.",
+            help="Report how many rows are new without saving to the database.",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        Option(
+            "--resume",
+            help="Continue an interrupted import of the same files, "
+            "without writing the batches it already committed.",
         ),
     ] = False,
 ) -> None:
-    """Import transactions from a bank CSV file."""
-    console.print(
-        f"Parsing [bold]{file_path.name}[/] using [cyan]{bank}[/] importer..."
-    )
+    """Import transactions from bank statements (CSV or camt.053 XML)."""
+    sources = ([file_path] if file_path else []) + (paths or [])
+    if not sources:
+        sources = [Path(prompt("File path"))]
+
+    from_stdin = str(sources[0]) == "-"
+    if from_stdin and len(sources) > 1:
+        console.print(render_error(message="stdin cannot be combined with files."))
+        raise Exit(1)
+    if from_stdin and resume:
+        console.print(render_error(message="--resume needs files, not stdin."))
+        raise Exit(1)
 
     try:
-        with Session(engine) as session:
-            transactions = import_transactions(
-                session=session,
-                bank_name=bank,
-                file_path=file_path,
-                dry_run=dry_run,
-            )
+        file_paths = [] if from_stdin else resolve_import_paths(sources)
+        if len(file_paths) == 1:
+            filename = file_paths[0].name
+        else:
+            filename = "stdin" if from_stdin else f"{len(file_paths)} files"
+        if bank:
             console.print(
-                render_import_summary(
-                    transactions=transactions, filename=file_path.name, dry_run=dry_run
-                )
+                f"Parsing [bold]{filename}[/] using [cyan]{bank}[/] importer..."
             )
+        else:
+            console.print(f"Parsing [bold]{filename}[/], detecting the bank...")
+
+        with (
+            Session(engine) as session,
+            console.status("Importing...") as status,
+        ):
+
+            def show_progress(summary: ImportSummary) -> None:
+                status.update(f"Importing... [bold]{summary.count:,}[/] rows so far")
+
+            if from_stdin:
+                summary = import_transactions(
+                    session=session,
+                    bank_name=bank,
+                    source=sys.stdin.buffer,
+                    dry_run=dry_run,
+                    on_progress=show_progress,
+                )
+            else:
+                summary = import_files(
+                    session=session,
+                    bank_name=bank,
+                    file_paths=file_paths,
+                    dry_run=dry_run,
+                    resume=resume,
+                    on_progress=show_progress,
+                )
+        console.print(
+            render_import_summary(summary=summary, filename=filename, dry_run=dry_run)
+        )
     except ValueError as e:
         console.print(render_error(message=str(e)))
         raise Exit(1)
@@ -320,6 +450,133 @@ def run_import(
         raise Exit(1)
 
 
+@app.command(name="watch")
+def watch_cmd(
+    directory: Annotated[
+        Path,
+        Argument(
+            exists=True,
+            file_okay=False,
+            help="Folder to watch for new bank statements.",
+        ),
+    ],
+    bank: Annotated[
+        Optional[str],
+        Option(
+            "--bank",
+            "-b",
+            help="Bank of every statement. Detected per file when omitted.",
+            autocompletion=get_bank_names,
+        ),
+    ] = None,
+    interval: Annotated[
+        float,
+        Option(
+            "--interval",
+            "-i",
+            min=0.1,
+            help="Seconds between checks of the folder.",
+        ),
+    ] = 5.0,
+    once: Annotated[
+        bool,
+        Option("--once", help="Import what is waiting and exit."),
+    ] = False,
+) -> None:
+    """Import new or changed statements dropped into a folder, until stopped."""
+    # Size and modification time of every file already considered.
+    seen: dict[Path, tuple[int, int]] = {}
+    if not once:
+        console.print(f"Watching [bold]{directory}[/]. Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            with Session(engine) as session:
+                # Files changed within one interval may still be being written.
+                file_hashes = find_new_statements(
+                    session=session,
+                    directory=directory,
+                    seen=seen,
+                    settle=0 if once else interval,
+                )
+                if file_hashes:
+                    summary, failures = import_new_statements(
+                        session=session, bank_name=bank, file_hashes=file_hashes
+                    )
+                    # Failed files are tried again on the next check.
+                    mark_seen(seen, file_hashes.keys() - failures.keys())
+                    filename = (
+                        next(iter(file_hashes)).name
+                        if len(file_hashes) == 1
+                        else f"{len(file_hashes)} files"
+                    )
+                    if summary.count or not failures:
+                        console.print(
+                            render_import_summary(
+                                summary=summary, filename=filename, dry_run=False
+                            )
+                        )
+                    for path, error in failures.items():
+                        console.print(
+                            render_error(message=f"Skipped {path.name}: {error}")
+                        )
+                elif once:
+                    console.print(render_warning(message="No new statements found."))
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        console.print("Stopped watching.")
+
+
+# --- Imports Sub-Commands ---
+
+
+@imports_app.command(name="list")
+def list_imports_cmd():
+    """List imports, newest first."""
+    with Session(engine) as session:
+        batches = get_import_batches(session=session)
+
+    if not batches:
+        console.print(render_warning(message="No imports found."))
+        return
+
+    console.print(render_import_batch_list(batches=batches))
+
+
+@imports_app.command(name="rollback")
+def rollback_import_cmd(
+    import_id: Annotated[int, Argument(help="ID of the import to roll back.")],
+    force: Annotated[
+        bool,
+        Option(
+            "--force",
+            "-f",
+            help="Roll back without confirmation.",
+        ),
+    ] = False,
+):
+    """Delete every transaction added by an import."""
+    if not force:
+        if not confirm(f"Are you sure you want to roll back import #{import_id}?"):
+            raise Exit()
+
+    with Session(engine) as session:
+        removed = rollback_import(session=session, import_batch_id=import_id)
+
+    if removed is None:
+        console.print(render_error(message=f"Import #{import_id} not found."))
+        raise Exit(1)
+
+    console.print(
+        render_success(
+            message=f"Rolled back import [bold]#{import_id}[/]: "
+            f"removed {removed} transactions."
+        )
+    )
+
+
 @app.callback()
 def callback():
     """Manage transaction history."""
@@ -1,6 +1,6 @@
 from rich.table import Table
 
-from budy.schemas import Category, CategoryRule
+from budy.schemas import Category, CategoryRule, RuleApplySummary
 
 
 def render_category_list(categories: list[Category]) -> Table:
@@ -39,3 +39,23 @@ def render_rule_list(rules: list[tuple[CategoryRule, Category]]) -> Table:
         )
 
     return table
+
+
+def render_rule_apply_summary(*, summary: RuleApplySummary) -> Table:
+    """Renders how many transactions each rule re-categorized."""
+    table = Table(
+        title="Applied Rules",
+        caption=f"{summary.changed} of {summary.scanned} scanned transactions changed",
+    )
+
+    table.add_column("ID", style="dim", width=4)
+    table.add_column("Pattern", style="cyan")
+    table.add_column("Assigns To", style="bold")
+    table.add_column("Changed", justify="right")
+
+    for item in summary.rules:
+        table.add_row(
+            str(item.rule_id), item.pattern, item.category_name, str(item.count)
+        )
+
+    return table
@@ -0,0 +1,17 @@
+from rich.table import Table
+
+from budy.schemas import PragmaSetting
+
+
+def render_pragma_list(*, pragmas: list[PragmaSetting]) -> Table:
+    """Renders the configured vs effective SQLite pragmas."""
+    table = Table(title="SQLite Pragmas")
+    table.add_column("Pragma", style="cyan")
+    table.add_column("Configured", justify="right", style="dim")
+    table.add_column("Effective", justify="right", style="bold")
+
+    for pragma in pragmas:
+        style = "green" if pragma.configured == pragma.effective else "yellow"
+        table.add_row(pragma.name, pragma.configured, f"[{style}]{pragma.effective}[/]")
+
+    return table
@@ -4,7 +4,7 @@ from rich.console import Group
 from rich.table import Table
 
 from budy.config import settings
-from budy.schemas import Transaction
+from budy.schemas import ImportBatch, ImportSummary, Transaction
 from budy.views.messages import render_success, render_warning
 
 
@@ -59,6 +59,23 @@ def render_transaction_list(
     return table
 
 
+def render_page_navigation(
+    *, older_cursor: int | None, newer_cursor: int | None, page_size: int
+) -> str:
+    """Renders the commands to fetch the neighbouring pages."""
+    hints = []
+    if older_cursor is not None:
+        hints.append(
+            f"Older: [green]budy transactions list --before {older_cursor} -n {page_size}[/]"
+        )
+    if newer_cursor is not None:
+        hints.append(
+            f"Newer: [green]budy transactions list --after {newer_cursor} -n {page_size}[/]"
+        )
+
+    return "\n".join(hints) if hints else "[dim]No more pages.[/]"
+
+
 def render_simple_transaction_list(
     *, transactions: list[Transaction], title: str = "Transactions"
 ) -> Table:
@@ -87,22 +104,64 @@ def render_simple_transaction_list(
 
 
 def render_import_summary(
-    *, transactions: list[Transaction], filename: str, dry_run: bool
+    *, summary: ImportSummary, filename: str, dry_run: bool
 ) -> Group | str:
     """Renders the post-import summary message."""
-    if not transactions:
-        return render_warning(message=f"No valid expenses found in {filename}.")
+    invalid_text = (
+        f"[yellow]Ignored {summary.invalid} rows with an unreadable date or amount.[/]"
+    )
+    if not summary.count:
+        warning = render_warning(message=f"No valid expenses found in {filename}.")
+        return Group(warning, invalid_text) if summary.invalid else warning
 
-    count = len(transactions)
-    total_display = sum(t.amount for t in transactions) / 100.0
+    count = summary.count
+    total_display = summary.total_amount / 100.0
 
-    summary_text = f"\nFound [bold]{count}[/] transactions totaling [green]{settings.currency_symbol}{total_display:,.2f}[/]."
+    summary_text = f"\nFound [bold]{count}[/] transactions totaling [green]{settings.currency_symbol}{total_display:,.2f}[/] between {summary.first_date} and {summary.last_date}."
+    if summary.banks:
+        summary_text += f" Read as [cyan]{', '.join(summary.banks)}[/]."
 
     if dry_run:
-        status_text = "[yellow]Dry run active. No changes made to database.[/]"
+        status_text = (
+            f"[yellow]Dry run: {count - summary.skipped} new, {summary.skipped} "
+            "already imported. No changes made to database.[/]"
+        )
+    elif summary.skipped == count:
+        status_text = render_warning(
+            message=f"All {count} transactions were already imported."
+        )
     else:
         status_text = render_success(
-            message=f"Successfully imported {count} transactions!"
+            message=f"Successfully imported {count - summary.skipped} transactions!"
         )
+        if summary.skipped:
+            status_text = Group(
+                status_text,
+                f"[dim]Skipped {summary.skipped} already imported transactions.[/]",
+            )
 
+    if summary.invalid:
+        return Group(summary_text, status_text, invalid_text)
     return Group(summary_text, status_text)
+
+
+def render_import_batch_list(*, batches: list[ImportBatch]) -> Table:
+    """Renders the imports that can be rolled back."""
+    table = Table(title="Imports")
+
+    table.add_column("ID", style="dim", width=4)
+    table.add_column("Imported", style="cyan")
+    table.add_column("File", style="bold")
+    table.add_column("Bank")
+    table.add_column("Rows", justify="right")
+
+    for batch in batches:
+        table.add_row(
+            str(batch.id),
+            batch.imported_at.strftime("%Y-%m-%d %H:%M"),
+            batch.file_name,
+            batch.bank,
+            str(batch.row_count),
+        )
+
+    return table
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from budy import app
+
+runner = CliRunner()
+
+
+def test_help_lists_lazy_commands():
+    """E2E: Top-level help lists every sub-command."""
+    result = runner.invoke(app, ["--help"])
+
+    assert result.exit_code == 0
+    for name in ["transactions", "budgets", "categories", "reports", "setup"]:
+        assert name in result.stdout
+
+
+def test_help_does_not_import_subcommands():
+    """Top-level help must not import sub-command modules or their dependencies."""
+    code = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from budy import app\n"
+        "CliRunner().invoke(app, ['--help'])\n"
+        "heavy = ('budy.transactions', 'budy.database', 'polars', 'sqlmodel')\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == ""
+
+
+def test_unknown_command_suggests_lazy_command():
+    """E2E: Typos still get suggestions for lazily registered commands."""
+    result = runner.invoke(app, ["transaction"])
+
+    assert result.exit_code != 0
+    assert "transactions" in result.output
@@ -0,0 +1,129 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from budy.client import STDOUT, forward, write_frame
+
+
+@pytest.fixture(name="daemon")
+def daemon_fixture(tmp_path, monkeypatch):
+    path = tmp_path / "budy.sock"
+    monkeypatch.setenv("BUDY_SOCKET", str(path))
+    monkeypatch.setenv("BUDY_DB_URL", f"sqlite:///{tmp_path / 'budy.db'}")
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from budy import app; app(['serve'])"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while not path.exists():
+        assert process.poll() is None, "daemon exited during start-up"
+        assert time.monotonic() < deadline, "daemon did not start in time"
+        time.sleep(0.05)
+
+    yield process
+
+    process.terminate()
+    process.wait(timeout=10)
+    assert not path.exists()
+
+
+def test_forward_runs_command_on_daemon(daemon, capfd):
+    """E2E: A running daemon executes forwarded commands and streams output back."""
+    assert forward(["transactions", "add", "-a", "12.34", "-d", "2024-05-01"]) == 0
+    assert "Added!" in capfd.readouterr().out
+
+    assert forward(["reports", "payees", "--year", "2024"]) == 0
+    assert "12.34" in capfd.readouterr().out
+
+
+def test_forward_reports_exit_code(daemon, capfd):
+    """Errors raised on the daemon are reported with their exit code."""
+    code = forward(["transactions", "delete", "999999", "--force"])
+
+    assert code == 1
+    assert "not found" in capfd.readouterr().out
+
+
+def test_forward_refuses_other_database(daemon, monkeypatch):
+    """Clients pointing at a different database run in-process."""
+    monkeypatch.setenv("BUDY_DB_URL", "sqlite:///:memory:")
+
+    assert forward(["reports", "weekday"]) is None
+
+
+def test_forward_falls_back_without_daemon(tmp_path, monkeypatch):
+    """Without a daemon the client asks for in-process execution."""
+    monkeypatch.setenv("BUDY_SOCKET", str(tmp_path / "missing.sock"))
+
+    assert forward(["reports", "weekday"]) is None
+
+
+def test_forward_skips_local_commands(daemon):
+    """Interactive commands always run in-process."""
+    assert forward(["setup"]) is None
+
+
+def test_forward_reports_lost_daemon(tmp_path, monkeypatch, capfd):
+    """A daemon dying mid-command is reported as an error, not a traceback."""
+    path = tmp_path / "budy.sock"
+    monkeypatch.setenv("BUDY_SOCKET", str(path))
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen()
+
+    def hang_up():
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(4096)
+            write_frame(conn, STDOUT, b"Importing...\n")
+
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    with server:
+        code = forward(["reports", "weekday"])
+    thread.join()
+
+    assert code == 1
+    captured = capfd.readouterr()
+    assert "Importing..." in captured.out
+    assert "Lost the connection to the budy daemon" in captured.err
+
+
+def test_piped_import_runs_in_process(daemon):
+    """Piped statements are imported in-process; the daemon cannot read stdin."""
+    assert forward(["transactions", "import", "--bank", "lhv", "--file", "-"]) is None
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from budy import main; main()",
+            "transactions",
+            "import",
+            "--bank",
+            "lhv",
+            "--file",
+            "-",
+        ],
+        input="Kuupäev,Saaja/maksja nimi,Summa,Deebet/Kreedit (D/C)\n"
+        "2024-05-01,Rimi,3.50,D\n",
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Successfully imported 1 transactions" in result.stdout
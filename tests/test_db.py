@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import inspect
+from sqlmodel import create_engine
+from typer.testing import CliRunner
+
+from budy import app
+from budy.migrations import SCHEMA_VERSION, get_schema_version, migrate
+
+runner = CliRunner()
+
+
+def test_migrate_fresh_database(tmp_path):
+    """A fresh database is created at the latest schema version."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    assert migrate(engine) == SCHEMA_VERSION
+
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert inspect(conn).has_table("transaction")
+
+    # Second run is a no-op.
+    assert migrate(engine) == 0
+
+
+def test_migrate_legacy_database(tmp_path):
+    """An unversioned database gets missing columns added and is stamped."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE category (id INTEGER PRIMARY KEY)")
+        conn.exec_driver_sql(
+            'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, amount INTEGER, '
+            "entry_date DATE, receiver VARCHAR, description VARCHAR)"
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO "transaction" (amount, entry_date, receiver) '
+            "VALUES (100, '2024-01-01', 'Xsolla')"
+        )
+
+    assert migrate(engine) == SCHEMA_VERSION
+
+    with engine.connect() as conn:
+        columns = {c["name"] for c in inspect(conn).get_columns("transaction")}
+        assert {"category_id", "is_self_transfer", "payee_id"} <= columns
+        assert get_schema_version(conn) == SCHEMA_VERSION
+        assert conn.exec_driver_sql('SELECT count(*) FROM "transaction"').scalar() == 1
+        assert (
+            conn.exec_driver_sql(
+                'SELECT display_name FROM payee JOIN "transaction" ON payee_id = payee.id'
+            ).scalar()
+            == "Xsolla"
+        )
+        # Existing rows are backfilled into the derived tables.
+        assert (
+            conn.exec_driver_sql("SELECT total_amount FROM monthlysummary").scalar()
+            == 100
+        )
+        assert (
+            conn.exec_driver_sql(
+                "SELECT count(*) FROM transaction_fts WHERE transaction_fts MATCH 'x*'"
+            ).scalar()
+            == 1
+        )
+
+
+def test_db_migrate_command():
+    """E2E: `budy db migrate` reports the schema version."""
+    result = runner.invoke(app, ["db", "migrate"])
+
+    assert result.exit_code == 0
+    assert f"version {SCHEMA_VERSION}" in result.stdout
+
+
+def test_db_pragmas_command():
+    """E2E: `budy db pragmas` lists the configured SQLite pragmas."""
+    result = runner.invoke(app, ["db", "pragmas"])
+
+    assert result.exit_code == 0
+    for name in ["journal_mode", "synchronous", "cache_size", "mmap_size"]:
+        assert name in result.stdout
+
+
+def test_save_config_round_trips_nested_settings(tmp_path):
+    """The nested config sections written by setup load back unchanged."""
+    import tomllib
+
+    from budy.config import DatabaseConfig, IdentityConfig, ImportConfig, Settings
+    from budy.setup import save_config
+
+    config_path = tmp_path / "config.toml"
+    original = Settings(
+        first_name="Jane",
+        last_name="Doe",
+        identity=IdentityConfig(household=["Alex Doe"], ibans=["EE38 2200"]),
+        imports=ImportConfig(batch_size=1000, chunk_size=100),
+        database=DatabaseConfig(journal_mode="delete", cache_size=-2000),
+    )
+    original.banks["lhv"].date_format = "%d.%m.%Y"
+    original.banks["lhv"].dtypes = {"Kuupäev": "String"}
+    save_config(config_path, original)
+
+    with open(config_path, "rb") as f:
+        loaded = Settings(**tomllib.load(f))
+
+    assert loaded.identity == original.identity
+    assert loaded.imports == original.imports
+    assert loaded.database == original.database
+    assert loaded.banks == original.banks
+
+
+def test_db_rebuild_search_command():
+    """E2E: `budy db rebuild-search` re-indexes stored transactions."""
+    result = runner.invoke(app, ["db", "rebuild-search"])
+
+    assert result.exit_code == 0
+    assert "Rebuilt search index" in result.stdout
+
+
+def test_db_commands_migrate_a_fresh_database(tmp_path):
+    """E2E: maintenance commands bring a fresh database up to date first."""
+    env = {
+        **os.environ,
+        "BUDY_DB_URL": f"sqlite:///{tmp_path / 'fresh.db'}",
+        "BUDY_NO_DAEMON": "1",
+        "XDG_CONFIG_HOME": str(tmp_path),
+        "PYTHONPATH": os.pathsep.join(sys.path),
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from budy import main; main()",
+            "db",
+            "rebuild-search",
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Rebuilt search index" in result.stdout
+
+
+def test_db_rebuild_summaries_command():
+    """E2E: `budy db rebuild-summaries` recomputes the monthly summaries."""
+    result = runner.invoke(app, ["db", "rebuild-summaries"])
+
+    assert result.exit_code == 0
+    assert "monthly summary rows" in result.stdout
@@ -95,3 +95,608 @@ def test_import_csv_workflow(tmp_path, transactions):
         total_imported = sum(t.amount for t in db_txs)
         expected_total = sum(int(amt * 100) for _, amt, _, _ in transactions)
         assert total_imported == expected_total
+
+
+def test_import_writes_in_chunks(tmp_path, monkeypatch):
+    """Rows are written in configured chunks and summarized with their date span."""
+    from budy.config import settings as app_settings
+    from budy.schemas import Payee
+
+    reset_db()
+    monkeypatch.setattr(app_settings.imports, "chunk_size", 2)
+
+    csv_file = tmp_path / "statement.csv"
+    with open(csv_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["Kuupäev", "Saaja/maksja nimi", "Summa", "Deebet/Kreedit (D/C)"]
+        )
+        for day in range(1, 6):
+            writer.writerow([f"2024-05-0{day}", "Rimi", "10.50", "D"])
+        writer.writerow(["2024-05-06", "", "1.00", "D"])
+        writer.writerow(["2024-05-07", "Employer", "999.00", "C"])
+
+    result = CliRunner().invoke(
+        app, ["transactions", "import", "--bank", "lhv", "--file", str(csv_file)]
+    )
+
+    assert result.exit_code == 0
+    assert "Found 6 transactions" in result.stdout
+    assert "2024-05-01 and 2024-05-06" in result.stdout
+
+    with Session(engine) as session:
+        db_txs = session.exec(select(Transaction)).all()
+        assert sum(t.amount for t in db_txs) == 5 * 1050 + 100
+        payees = session.exec(select(Payee)).all()
+        assert [p.display_name for p in payees] == ["Rimi"]
+        assert {t.payee_id for t in db_txs} == {payees[0].id, None}
+
+
+def test_reimport_skips_known_rows(tmp_path, monkeypatch):
+    """Re-importing an overlapping statement only adds the new rows."""
+    from budy.config import settings as app_settings
+
+    reset_db()
+    monkeypatch.setattr(
+        app_settings.banks["lhv"], "reference_col", "Arhiveerimistunnus"
+    )
+    header = [
+        "Kuupäev",
+        "Arhiveerimistunnus",
+        "Saaja/maksja nimi",
+        "Summa",
+        "Deebet/Kreedit (D/C)",
+    ]
+
+    def run_import(rows, *options):
+        csv_file = tmp_path / "statement.csv"
+        with open(csv_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return CliRunner().invoke(
+            app,
+            ["transactions", "import", "--bank", "lhv", "--file", str(csv_file)]
+            + list(options),
+        )
+
+    first = [
+        ["2024-05-01", "A1", "Cafe", "3.50", "D"],
+        ["2024-05-01", "", "Cafe", "3.50", "D"],
+        ["2024-05-01", "", "Cafe", "3.50", "D"],
+    ]
+    result = run_import(first)
+    assert "Successfully imported 3 transactions" in result.stdout
+
+    second = first + [["2024-05-02", "A2", "Cafe", "3.50", "D"]]
+    result = run_import(second, "--dry-run")
+    assert "Dry run: 1 new, 3 already imported" in result.stdout
+    with Session(engine) as session:
+        assert len(session.exec(select(Transaction)).all()) == 3
+
+    result = run_import(second)
+    assert "Successfully imported 1 transactions" in result.stdout
+    assert "Skipped 3" in result.stdout
+
+    result = run_import(second)
+    assert "already imported" in result.stdout
+
+    with Session(engine) as session:
+        assert len(session.exec(select(Transaction)).all()) == 4
+
+
+def test_streaming_import_from_stdin(monkeypatch):
+    """`--file -` reads stdin in batches; records may span lines and batches."""
+    from budy.config import settings as app_settings
+
+    reset_db()
+    monkeypatch.setattr(app_settings.imports, "batch_size", 2)
+
+    statement = (
+        "Kuupäev,Saaja/maksja nimi,Selgitus,Summa,Deebet/Kreedit (D/C)\n"
+        '2024-05-01,Cafe,"two\nlines",3.50,D\n'
+        "2024-05-01,Cafe,,3.50,D\n"
+        "2024-05-01,Cafe,,3.50,D\n"
+        "2024-05-02,Rimi,,10.00,D\n"
+        "2024-05-03,Employer,,900.00,C\n"
+    )
+    runner = CliRunner()
+    args = ["transactions", "import", "--bank", "lhv", "--file", "-"]
+
+    result = runner.invoke(app, args, input=statement)
+
+    assert result.exit_code == 0
+    assert "Successfully imported 4 transactions" in result.stdout
+
+    # The repeated row in the second batch is numbered after the first one.
+    result = runner.invoke(app, args, input=statement)
+    assert "already imported" in result.stdout
+
+    with Session(engine) as session:
+        db_txs = session.exec(select(Transaction)).all()
+        assert len(db_txs) == 4
+        assert "two\nlines" in {t.description for t in db_txs}
+
+
+def test_import_many_files(tmp_path):
+    """Directories and glob patterns expand to all statements, parsed in parallel."""
+    reset_db()
+
+    header = "Kuupäev,Saaja/maksja nimi,Summa,Deebet/Kreedit (D/C)\n"
+    (tmp_path / "2023").mkdir()
+    for month in range(1, 4):
+        (tmp_path / "2023" / f"{month:02}.csv").write_text(
+            header + f"2023-{month:02}-10,Rimi,{month}.00,D\n", encoding="utf-8"
+        )
+    (tmp_path / "2024-01.csv").write_text(
+        header + "2024-01-10,Rimi,4.00,D\n", encoding="utf-8"
+    )
+    (tmp_path / "notes.txt").write_text("not a statement", encoding="utf-8")
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "transactions",
+            "import",
+            "--bank",
+            "lhv",
+            str(tmp_path / "2023"),
+            str(tmp_path / "2024-*.csv"),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "4 files" in result.stdout
+    assert "Successfully imported 4 transactions" in result.stdout
+
+    with Session(engine) as session:
+        amounts = sorted(t.amount for t in session.exec(select(Transaction)).all())
+        assert amounts == [100, 200, 300, 400]
+
+
+def test_import_detects_bank_from_header(tmp_path):
+    """Without --bank, each file is routed to the bank matching its header row."""
+    reset_db()
+
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "lhv.csv").write_text(
+        "\ufeffKuupäev,Saaja/maksja nimi,Selgitus,Summa,Deebet/Kreedit (D/C)\n"
+        "2024-01-10,Rimi,Food,1.00,D\n",
+        encoding="utf-8",
+    )
+    (inbox / "seb.csv").write_text(
+        "Kuupäev;Saaja/maksja nimi;Selgitus;Summa;Deebet/Kreedit (D/C)\n"
+        "2024-01-11;Rimi;Food;2,50;D\n",
+        encoding="utf-8",
+    )
+    (inbox / "swedbank.csv").write_text(
+        "Kuupäev;Saaja/Maksja;Selgitus;Summa;Deebet/Kreedit;Valuuta\n"
+        "2024-01-12;Rimi;Food;3,00;D;EUR\n",
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(app, ["transactions", "import", str(inbox)])
+    assert result.exit_code == 0
+    assert "detecting the bank" in result.stdout
+    assert "lhv, seb, swedbank" in result.stdout
+    assert "Successfully imported 3 transactions" in result.stdout
+
+    with Session(engine) as session:
+        amounts = sorted(t.amount for t in session.exec(select(Transaction)).all())
+        assert amounts == [100, 250, 300]
+
+    statement = (
+        "Kuupäev;Saaja/Maksja;Selgitus;Summa;Deebet/Kreedit\n2024-02-01;Coop;;4,00;D\n"
+    )
+    result = CliRunner().invoke(
+        app, ["transactions", "import", "--file", "-"], input=statement
+    )
+    assert result.exit_code == 0
+    assert "swedbank" in result.stdout
+
+    unknown = tmp_path / "unknown.csv"
+    unknown.write_text("Date,Amount\n2024-01-01,1.00\n", encoding="utf-8")
+    result = CliRunner().invoke(app, ["transactions", "import", str(unknown)])
+    assert result.exit_code == 1
+    assert "Could not detect the bank of unknown.csv" in result.stdout
+
+
+def test_import_with_date_format_and_projection(tmp_path, monkeypatch):
+    """Configured date formats are applied exactly; unused columns are not read."""
+    from budy.config import BankConfig
+    from budy.config import settings as app_settings
+
+    reset_db()
+    monkeypatch.setitem(
+        app_settings.banks,
+        "wide",
+        BankConfig(
+            delimiter=";",
+            decimal=",",
+            date_col="Date",
+            amount_col="Amount",
+            debit_credit_col="Type",
+            receiver_col="Payee",
+            date_format="%d.%m.%Y",
+            dtypes={"Payee": "String"},
+        ),
+    )
+
+    extra = [f"Extra{i}" for i in range(20)]
+    csv_file = tmp_path / "wide.csv"
+    csv_file.write_text(
+        ";".join(["Date", "Payee", *extra, "Amount", "Type"])
+        + "\n"
+        + ";".join(["03.02.2024", "12345", *["x"] * 20, "7,25", "D"])
+        + "\n"
+        + ";".join(["04.02.2024", "Rimi", *["1,5"] * 20, "1,00", "D"])
+        + "\n",
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(
+        app, ["transactions", "import", "--bank", "wide", str(csv_file)]
+    )
+    assert result.exit_code == 0
+
+    with Session(engine) as session:
+        rows = session.exec(select(Transaction).order_by(Transaction.entry_date)).all()
+        assert [(t.entry_date, t.receiver, t.amount) for t in rows] == [
+            (date(2024, 2, 3), "12345", 725),
+            (date(2024, 2, 4), "Rimi", 100),
+        ]
+
+
+def test_amounts_are_parsed_to_exact_cents(monkeypatch):
+    """Amount strings become cents without floats; unreadable rows are reported."""
+    from budy.config import settings as app_settings
+
+    reset_db()
+    monkeypatch.setattr(app_settings.banks["seb"], "thousands", ".")
+
+    statement = (
+        "Kuupäev;Saaja/maksja nimi;Selgitus;Summa;Deebet/Kreedit (D/C)\n"
+        "2024-03-01;Car dealer;;12.345.678,91;D\n"
+        "2024-03-02;Cafe;;0,29;D\n"
+        "2024-03-03;Bakery;;-1 234,5;D\n"
+        "2024-03-04;Typo;;12,3,4;D\n"
+        "not a date;Shop;;5,00;D\n"
+    )
+    result = CliRunner().invoke(
+        app,
+        ["transactions", "import", "--bank", "seb", "--file", "-"],
+        input=statement,
+    )
+    assert result.exit_code == 0
+    assert "Successfully imported 3 transactions" in result.stdout
+    assert "Ignored 2 rows with an unreadable date or amount" in result.stdout
+
+    with Session(engine) as session:
+        amounts = {t.receiver: t.amount for t in session.exec(select(Transaction))}
+        assert amounts == {
+            "Car dealer": 1234567891,
+            "Cafe": 29,
+            "Bakery": 123450,
+        }
+
+
+CAMT_053 = """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+  <BkToCstmrStmt>
+    <Stmt>
+      <Acct><Id><IBAN>EE382200221020145685</IBAN></Id></Acct>
+      {entries}
+    </Stmt>
+  </BkToCstmrStmt>
+</Document>
+"""
+
+CAMT_ENTRY = """
+      <Ntry>
+        <Amt Ccy="EUR">{amount}</Amt>
+        <CdtDbtInd>{direction}</CdtDbtInd>
+        <Sts>{status}</Sts>
+        <BookgDt><Dt>{day}</Dt></BookgDt>
+        <AcctSvcrRef>{ref}</AcctSvcrRef>
+        <NtryDtls><TxDtls>
+          <RltdPties>
+            <Cdtr><Nm>{name}</Nm></Cdtr>
+            <CdtrAcct><Id><IBAN>EE471000001020145685</IBAN></Id></CdtrAcct>
+          </RltdPties>
+          <RmtInf><Ustrd>{text}</Ustrd><Ustrd>part 2</Ustrd></RmtInf>
+        </TxDtls></NtryDtls>
+      </Ntry>
+"""
+
+
+def test_import_camt053_statement(tmp_path):
+    """camt.053 XML is streamed entry by entry and detected without --bank."""
+    reset_db()
+
+    def entry(ref, amount, name="Rimi", direction="DBIT", status="BOOK"):
+        return CAMT_ENTRY.format(
+            ref=ref,
+            amount=amount,
+            name=name,
+            direction=direction,
+            status=status,
+            day="2024-04-0" + ref[-1],
+            text="Groceries",
+        )
+
+    entries = [
+        entry("A1", "12.30"),
+        entry("A2", "5.00", name="", direction="DBIT"),
+        entry("A3", "99.99", direction="CRDT"),
+        entry("A4", "7.00", status="PDNG"),
+    ]
+    xml_file = tmp_path / "statement.xml"
+    xml_file.write_text(CAMT_053.format(entries="".join(entries)), encoding="utf-8")
+
+    result = CliRunner().invoke(app, ["transactions", "import", str(xml_file)])
+    assert result.exit_code == 0
+    assert "camt053" in result.stdout
+    assert "Successfully imported 2 transactions" in result.stdout
+
+    with Session(engine) as session:
+        rows = session.exec(select(Transaction).order_by(Transaction.entry_date)).all()
+        assert [(t.entry_date, t.amount, t.receiver) for t in rows] == [
+            (date(2024, 4, 1), 1230, "Rimi"),
+            (date(2024, 4, 2), 500, "EE471000001020145685"),
+        ]
+        assert rows[0].description == "Groceries part 2"
+
+    result = CliRunner().invoke(app, ["transactions", "import", str(xml_file)])
+    assert "All 2 transactions were already imported" in result.stdout
+
+
+def test_camt053_banks_take_no_csv_settings():
+    """camt.053 banks reject CSV settings, and only one of them may exist."""
+    import pytest
+    from pydantic import ValidationError
+
+    from budy.config import BankConfig, Settings
+
+    with pytest.raises(ValidationError, match="take no other settings: decimal"):
+        BankConfig(format="camt053", decimal=",")
+
+    with pytest.raises(ValidationError, match="Only one camt053 bank"):
+        Settings(
+            banks={"lhv-xml": {"format": "camt053"}, "seb-xml": {"format": "camt053"}}
+        )
+
+
+def test_resume_interrupted_import(tmp_path, monkeypatch):
+    """An interrupted import resumes after the last committed batch."""
+    from budy.config import settings as app_settings
+    from budy.schemas import ImportBatch, ImportJournal
+    from budy.services import transaction as service
+
+    reset_db()
+    monkeypatch.setattr(app_settings.imports, "batch_size", 2)
+
+    csv_file = tmp_path / "statement.csv"
+    csv_file.write_text(
+        "Kuupäev,Saaja/maksja nimi,Summa,Deebet/Kreedit (D/C)\n"
+        + "".join(f"2024-06-{day:02},Shop {day},{day}.00,D\n" for day in range(1, 6)),
+        encoding="utf-8",
+    )
+
+    write_batch = service._write_batch
+    batches: list[int] = []
+
+    def flaky_write_batch(**kwargs):
+        batches.append(kwargs["frame"].height)
+        if len(batches) == 2:
+            raise RuntimeError("laptop went to sleep")
+        return write_batch(**kwargs)
+
+    monkeypatch.setattr(service, "_write_batch", flaky_write_batch)
+    args = ["transactions", "import", "--bank", "lhv", str(csv_file)]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 1
+
+    with Session(engine) as session:
+        journal = session.exec(select(ImportJournal)).one()
+        assert (journal.rows_committed, journal.batches_committed) == (2, 1)
+        assert not journal.completed
+
+    # Only the batches after the committed one are written.
+    result = CliRunner().invoke(app, [*args, "--resume"])
+    assert result.exit_code == 0
+    assert batches[2:] == [2, 1]
+    assert "Successfully imported 3 transactions" in result.stdout
+
+    with Session(engine) as session:
+        journal = session.exec(select(ImportJournal)).one()
+        assert (journal.rows_committed, journal.completed) == (5, True)
+        amounts = sorted(t.amount for t in session.exec(select(Transaction)))
+        assert amounts == [100, 200, 300, 400, 500]
+        # The resumed run continues the interrupted import's batch.
+        assert session.exec(select(ImportBatch.row_count)).one() == 5
+
+
+def test_rollback_import(tmp_path):
+    """Rolling back an import removes its rows and their share of the summaries."""
+    from budy.schemas import MonthlySummary
+
+    reset_db()
+    header = "Kuupäev,Saaja/maksja nimi,Summa,Deebet/Kreedit (D/C)\n"
+    first = tmp_path / "may.csv"
+    first.write_text(
+        header + "2024-05-03,Rimi,10.00,D\n2024-06-01,Rimi,2.00,D\n",
+        encoding="utf-8",
+    )
+    second = tmp_path / "june.csv"
+    second.write_text(
+        header + "2024-06-01,Rimi,2.00,D\n2024-06-02,Bolt,5.00,D\n",
+        encoding="utf-8",
+    )
+
+    runner = CliRunner()
+    for statement in (first, second):
+        result = runner.invoke(
+            app, ["transactions", "import", "--bank", "lhv", str(statement)]
+        )
+        assert result.exit_code == 0
+
+    result = runner.invoke(app, ["transactions", "imports", "list"])
+    assert "may.csv" in result.stdout and "june.csv" in result.stdout
+
+    # june.csv only added the Bolt row; the Rimi row belonged to may.csv.
+    result = runner.invoke(app, ["transactions", "imports", "rollback", "2", "-f"])
+    assert result.exit_code == 0
+    assert "removed 1 transactions" in result.stdout
+
+    result = runner.invoke(app, ["transactions", "imports", "rollback", "2", "-f"])
+    assert result.exit_code == 1
+
+    with Session(engine) as session:
+        amounts = sorted(t.amount for t in session.exec(select(Transaction)))
+        assert amounts == [200, 1000]
+        summaries = {
+            (s.month, s.total_amount, s.count)
+            for s in session.exec(select(MonthlySummary))
+        }
+        assert summaries == {(5, 1000, 1), (6, 200, 1)}
+        # The search index lost the import's rows too.
+        matches = session.connection().exec_driver_sql(
+            "SELECT rowid FROM transaction_fts WHERE transaction_fts MATCH 'bolt'"
+        )
+        assert matches.all() == []
+
+    # The rolled back file can be imported again.
+    result = runner.invoke(
+        app, ["transactions", "import", "--bank", "lhv", str(second)]
+    )
+    assert "Successfully imported 1 transactions" in result.stdout
+
+
+def test_failed_rollback_keeps_summary_trigger(tmp_path, monkeypatch):
+    """A rollback that fails midway changes nothing, not even the triggers."""
+    import pytest
+    from sqlalchemy import text
+
+    from budy.services import transaction as service
+
+    reset_db()
+    statement = tmp_path / "may.csv"
+    statement.write_text(
+        "Kuupäev,Saaja/maksja nimi,Summa,Deebet/Kreedit (D/C)\n"
+        "2024-05-03,Rimi,10.00,D\n",
+        encoding="utf-8",
+    )
+    result = CliRunner().invoke(
+        app, ["transactions", "import", "--bank", "lhv", str(statement)]
+    )
+    assert result.exit_code == 0
+
+    monkeypatch.setattr(
+        service, "MONTHLY_SUMMARY_SUBTRACT_IMPORT", ["SELECT no_such_function()"]
+    )
+    with Session(engine) as session, pytest.raises(Exception):
+        service.rollback_import(session=session, import_batch_id=1)
+
+    with Session(engine) as session:
+        triggers = session.execute(
+            text(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND name IN ('monthlysummary_delete', 'transaction_fts_delete')"
+            )
+        ).scalars()
+        assert sorted(triggers) == ["monthlysummary_delete", "transaction_fts_delete"]
+        assert len(session.exec(select(Transaction)).all()) == 1
+
+
+def test_watch_journals_empty_files_and_retries_failures(tmp_path):
+    """Statements without rows count as done; files that fail are tried again."""
+    from budy.services.transaction import (
+        find_new_statements,
+        import_new_statements,
+        mark_seen,
+    )
+
+    reset_db()
+    header = "Kuupäev,Saaja/maksja nimi,Selgitus,Summa,Deebet/Kreedit (D/C)\n"
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "full.csv").write_text(
+        header + "2024-01-10,Rimi,Food,1.00,D\n", encoding="utf-8"
+    )
+    (inbox / "empty.csv").write_text(header, encoding="utf-8")
+    (inbox / "unknown.csv").write_text("foo,bar\n1,2\n", encoding="utf-8")
+
+    seen: dict = {}
+    with Session(engine) as session:
+        file_hashes = find_new_statements(session=session, directory=inbox, seen=seen)
+        assert {p.name for p in file_hashes} == {"full.csv", "empty.csv", "unknown.csv"}
+        assert seen == {}
+
+        summary, failures = import_new_statements(
+            session=session, bank_name=None, file_hashes=file_hashes
+        )
+        assert summary.count == 1
+        assert [p.name for p in failures] == ["unknown.csv"]
+        mark_seen(seen, file_hashes.keys() - failures.keys())
+
+        # The failed file is retried; a restart finds nothing else to import.
+        retried = find_new_statements(session=session, directory=inbox, seen=seen)
+        assert [p.name for p in retried] == ["unknown.csv"]
+        restarted = find_new_statements(session=session, directory=inbox, seen={})
+        assert [p.name for p in restarted] == ["unknown.csv"]
+
+
+def test_watch_imports_new_statements(tmp_path, monkeypatch):
+    """A watched folder imports each statement once, and again only if it changes."""
+    from budy.services import transaction as service
+
+    reset_db()
+    file_hash = service._file_hash
+    hashed: list[str] = []
+
+    def counting_file_hash(path):
+        hashed.append(path.name)
+        return file_hash(path)
+
+    monkeypatch.setattr(service, "_file_hash", counting_file_hash)
+    header = "Kuupäev,Saaja/maksja nimi,Selgitus,Summa,Deebet/Kreedit (D/C)\n"
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for month in range(1, 4):
+        (inbox / f"2024-{month:02}.csv").write_text(
+            header + f"2024-{month:02}-10,Rimi,Food,{month}.00,D\n",
+            encoding="utf-8",
+        )
+    (inbox / "unknown.csv").write_text("foo,bar\n1,2\n", encoding="utf-8")
+
+    runner = CliRunner()
+    args = ["transactions", "watch", str(inbox), "--once"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert "Successfully imported 3 transactions" in result.stdout
+    assert "Skipped unknown.csv" in result.stdout
+    # Each file is hashed once, when found, not again by its import.
+    assert sorted(hashed) == [
+        "2024-01.csv",
+        "2024-02.csv",
+        "2024-03.csv",
+        "unknown.csv",
+    ]
+    (inbox / "unknown.csv").unlink()
+
+    # Processed files are remembered by content hash in the database.
+    result = runner.invoke(app, args)
+    assert "No new statements found" in result.stdout
+
+    march = inbox / "2024-03.csv"
+    march.write_text(
+        march.read_text(encoding="utf-8") + "2024-03-11,Bolt,Taxi,7.00,D\n",
+        encoding="utf-8",
+    )
+    result = runner.invoke(app, args)
+    assert "Successfully imported 1 transactions" in result.stdout
+
+    with Session(engine) as session:
+        amounts = sorted(t.amount for t in session.exec(select(Transaction)))
+        assert amounts == [100, 200, 300, 700]
@@ -46,3 +46,117 @@ def test_monthly_report_calculation(year, month, budget_amount, tx_amount):
     assert f"{app_settings.currency_symbol}{budget_amount:,.0f}" in result.stdout
     expected_spent = f"{app_settings.currency_symbol}{tx_amount:,.0f}"
     assert expected_spent in result.stdout
+
+
+def test_monthly_summary_tracks_changes():
+    """The monthly summary follows inserts, updates and deletes, and rebuilds identically."""
+    from sqlmodel import select
+
+    from budy.schemas import MonthlySummary
+    from budy.services.report import rebuild_monthly_summaries
+
+    reset_db()
+
+    def summary(session):
+        rows = session.exec(select(MonthlySummary)).all()
+        return sorted(
+            (r.year, r.month, r.category_id, r.total_amount, r.count) for r in rows
+        )
+
+    with Session(engine) as session:
+        first = Transaction(entry_date=date(2024, 1, 5), amount=1000)
+        second = Transaction(entry_date=date(2024, 1, 20), amount=500)
+        session.add(first)
+        session.add(second)
+        session.commit()
+        assert summary(session) == [(2024, 1, 0, 1500, 2)]
+
+        first.entry_date = date(2024, 2, 1)
+        first.amount = 700
+        session.add(first)
+        session.commit()
+        assert summary(session) == [(2024, 1, 0, 500, 1), (2024, 2, 0, 700, 1)]
+
+        session.delete(second)
+        session.commit()
+        assert summary(session) == [(2024, 2, 0, 700, 1)]
+
+        rebuild_monthly_summaries(session=session)
+        assert summary(session) == [(2024, 2, 0, 700, 1)]
+
+
+def test_self_transfers_are_flagged_and_excluded(monkeypatch):
+    """Transfers to the configured user are flagged on write and left out of reports."""
+    from budy.services.report import generate_monthly_report_data, get_top_payees
+
+    reset_db()
+    monkeypatch.setattr(app_settings, "first_name", "Jane")
+    monkeypatch.setattr(app_settings, "last_name", "Doe")
+
+    with Session(engine) as session:
+        own = Transaction(entry_date=date(2024, 3, 1), amount=5000, receiver="J. Doe")
+        shop = Transaction(entry_date=date(2024, 3, 2), amount=1200, receiver="Shop")
+        session.add(own)
+        session.add(shop)
+        session.commit()
+        assert own.is_self_transfer and not shop.is_self_transfer
+
+        report = generate_monthly_report_data(
+            session=session, target_month=3, target_year=2024
+        )
+        assert report.total_spent == 1200
+        payees = get_top_payees(session=session, year=2024, limit=10)
+        assert [p.name for p in payees] == ["Shop"]
+
+    # After a name change, `budy db recompute-self-transfers` re-flags stored rows.
+    monkeypatch.setattr(app_settings, "first_name", "John")
+    monkeypatch.setattr(app_settings, "last_name", "Smith")
+    result = CliRunner().invoke(app, ["db", "recompute-self-transfers"])
+    assert result.exit_code == 0
+    assert "Flagged 0 transactions" in result.stdout
+
+    with Session(engine) as session:
+        report = generate_monthly_report_data(
+            session=session, target_month=3, target_year=2024
+        )
+        assert report.total_spent == 6200
+
+
+def test_owner_matcher_identities(monkeypatch):
+    """Aliases, household members and IBANs all count as the owner, in both forms."""
+    import polars as pl
+
+    from budy.config import IdentityConfig
+    from budy.identity import get_owner_matcher
+
+    monkeypatch.setattr(app_settings, "first_name", "J.")
+    monkeypatch.setattr(app_settings, "last_name", "Doe")
+    monkeypatch.setattr(
+        app_settings,
+        "identity",
+        IdentityConfig(
+            aliases=["Jane Smith"],
+            household=["Alex Doe"],
+            ibans=["EE38 2200 2210 2014 5685"],
+        ),
+    )
+    matcher = get_owner_matcher()
+
+    receivers = {
+        "Jane Doe": True,  # reverse match: "J. Doe" is a variant of "Jane Doe"
+        "j.smith": True,
+        " A. DOE ": True,
+        "EE382200221020145685": True,
+        "John Smith": False,
+        "Shop": False,
+        None: False,
+    }
+    flags = (
+        pl.DataFrame({"receiver": list(receivers)}, schema={"receiver": pl.String})
+        .select(matcher.expr(pl.col("receiver")))
+        .to_series()
+        .to_list()
+    )
+
+    assert [matcher.match(r) for r in receivers] == list(receivers.values())
+    assert flags == list(receivers.values())
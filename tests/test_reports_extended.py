@@ -55,6 +55,30 @@ def test_search_transactions(keyword):
     assert "Lunch" not in result.stdout
 
 
+def test_search_folds_diacritics_and_matches_prefixes():
+    """E2E: Search ignores accents and case, and matches word prefixes."""
+    reset_db()
+
+    with Session(engine) as session:
+        session.add(
+            Transaction(amount=1000, entry_date=date.today(), receiver="Rimi Õismäe")
+        )
+        session.add(Transaction(amount=500, entry_date=date.today(), receiver="Cafe"))
+        session.commit()
+
+    result = runner.invoke(app, ["reports", "search", "oism"])
+
+    assert result.exit_code == 0
+    assert "Rimi Õismäe" in result.stdout
+    assert "Cafe" not in result.stdout
+
+    # Fragments inside a word are only found by an explicit substring scan.
+    result = runner.invoke(app, ["reports", "search", "afe"])
+    assert "No transactions found" in result.stdout
+    result = runner.invoke(app, ["reports", "search", "afe", "--substring"])
+    assert "Cafe" in result.stdout
+
+
 def test_payee_ranking():
     """E2E: Payees are ranked correctly by total spend."""
     reset_db()
@@ -81,6 +105,31 @@ def test_payee_ranking():
     assert result.stdout.find("Big Spender") < result.stdout.find("Little Spender")
 
 
+def test_receivers_are_interned_as_payees():
+    """Receivers differing only in case or spacing share one payee row."""
+    from sqlmodel import func, select
+
+    from budy.schemas import Payee
+    from budy.services.report import get_top_payees
+
+    reset_db()
+
+    with Session(engine) as session:
+        for receiver in ["Rimi Õismäe", "RIMI  õismäe ", "Cafe"]:
+            session.add(
+                Transaction(amount=1000, entry_date=date.today(), receiver=receiver)
+            )
+        session.commit()
+
+        assert session.exec(select(func.count()).select_from(Payee)).one() == 2
+
+        payees = get_top_payees(session=session, year=None, limit=10)
+        assert [(p.name, p.count, p.total) for p in payees] == [
+            ("Rimi Õismäe", 2, 2000),
+            ("Cafe", 1, 1000),
+        ]
+
+
 def test_weekday_report_structure():
     """E2E: Weekday report runs without errors on valid data."""
     reset_db()
@@ -106,3 +106,162 @@ def test_rule_management():
     with Session(engine) as session:
         rules = session.exec(select(CategoryRule)).all()
         assert len(rules) == 0
+
+
+def test_rule_matcher_priority_and_refresh():
+    reset_db()
+    import polars as pl
+
+    from budy.rules import RuleMatcher
+    from budy.services.category import create_rule, delete_rule, get_rule_matcher
+
+    def categorize(matcher, *texts):
+        frame = pl.DataFrame({"text": list(texts)}, schema={"text": pl.String})
+        return frame.with_columns(c=matcher.expr(pl.col("text")))["c"].to_list()
+
+    # Overlapping patterns: the oldest rule wins, wherever it occurs.
+    matcher = RuleMatcher([("coffee", 1), ("shop", 2), ("", 3)])
+    assert categorize(
+        matcher, "coffee shop", "shop: coffee", "book shop", "anything"
+    ) == [1, 1, 2, 3]
+    assert categorize(RuleMatcher([("she", 1), ("he", 2)]), "ushers") == [1]
+    assert categorize(RuleMatcher([]), "anything") == [None]
+
+    runner.invoke(app, ["categories", "add", "Food"])
+    runner.invoke(app, ["categories", "add", "Fun"])
+    with Session(engine) as session:
+        food, fun = session.exec(select(Category).order_by(Category.id)).all()
+
+        rule = create_rule(session=session, pattern="Pizza", category_id=food.id)
+        matcher = get_rule_matcher(session=session)
+        assert categorize(matcher, "pizza palace") == [food.id]
+        # Unchanged rules reuse the compiled matcher.
+        assert get_rule_matcher(session=session) is matcher
+
+        create_rule(session=session, pattern="palace", category_id=fun.id)
+        assert categorize(get_rule_matcher(session=session), "fun palace") == [fun.id]
+
+        delete_rule(session=session, rule_id=rule.id)
+        matcher = get_rule_matcher(session=session)
+        assert categorize(matcher, "pizza palace") == [fun.id]
+
+        # A rule change by another process is seen through the rules version.
+        from budy.schemas import AppState, CategoryRule
+
+        session.add(CategoryRule(pattern="pizza", category_id=food.id))
+        session.merge(AppState(key="rules_version", value="elsewhere"))
+        session.commit()
+        assert get_rule_matcher(session=session) is not matcher
+        matcher = get_rule_matcher(session=session)
+        assert categorize(matcher, "pizza") == [food.id]
+
+
+def test_apply_rules_to_stored_transactions():
+    reset_db()
+    from budy.schemas import CategoryRule
+    from budy.services.transaction import create_transaction, update_transaction
+
+    runner.invoke(app, ["categories", "add", "Food"])
+    runner.invoke(app, ["categories", "add", "Fun"])
+    with Session(engine) as session:
+        food, fun = session.exec(select(Category).order_by(Category.id)).all()
+        food_id, fun_id = food.id, fun.id
+        for receiver in ["Pizza Place", "Cinema", "Pizza Cinema", "Bank"]:
+            t = create_transaction(session=session, amount=10)
+            update_transaction(session=session, transaction_id=t.id, receiver=receiver)
+        manual = create_transaction(session=session, amount=20, category_id=fun_id)
+        update_transaction(session=session, transaction_id=manual.id, receiver="Pizza")
+
+    runner.invoke(app, ["categories", "rules", "add", "pizza", "-c", str(food_id)])
+    runner.invoke(app, ["categories", "rules", "add", "cinema", "-c", str(fun_id)])
+
+    result = runner.invoke(app, ["categories", "rules", "apply"])
+    assert result.exit_code == 0
+    assert "3 of 4 scanned transactions changed" in result.stdout
+
+    def categories():
+        with Session(engine) as session:
+            rows = session.exec(
+                select(Transaction.receiver, Transaction.category_id)
+            ).all()
+        return dict(rows)
+
+    assert categories() == {
+        "Pizza Place": food_id,
+        "Cinema": fun_id,
+        "Pizza Cinema": food_id,
+        "Bank": None,
+        "Pizza": fun_id,
+    }
+
+    # Only transactions added since the last apply are scanned.
+    result = runner.invoke(app, ["categories", "rules", "apply", "--new"])
+    assert "No changes; 0 transactions scanned" in result.stdout
+    with Session(engine) as session:
+        t = create_transaction(session=session, amount=5)
+        update_transaction(session=session, transaction_id=t.id, receiver="Cinema 2")
+    result = runner.invoke(app, ["categories", "rules", "apply", "--new"])
+    assert "1 of 1 scanned transactions changed" in result.stdout
+
+    # --all also overrides existing categories where a rule matches.
+    result = runner.invoke(app, ["categories", "rules", "apply", "--all"])
+    assert result.exit_code == 0
+    assert "1 of 6 scanned transactions changed" in result.stdout
+    assert categories()["Pizza"] == food_id
+
+    with Session(engine) as session:
+        assert len(session.exec(select(CategoryRule)).all()) == 2
+
+
+def test_failed_bulk_apply_keeps_summary_trigger(monkeypatch):
+    """A bulk apply that fails midway leaves categories and triggers untouched."""
+    import pytest
+    from sqlalchemy import text
+
+    from budy.services import category as service
+    from budy.services.transaction import create_transaction, update_transaction
+
+    reset_db()
+    runner.invoke(app, ["categories", "add", "Food"])
+    runner.invoke(app, ["categories", "rules", "add", "pizza", "-c", "1"])
+    with Session(engine) as session:
+        t = create_transaction(session=session, amount=10)
+        update_transaction(session=session, transaction_id=t.id, receiver="Pizza")
+
+    monkeypatch.setattr(service, "_BULK_UPDATE_THRESHOLD", 0)
+    monkeypatch.setattr(
+        service, "MONTHLY_SUMMARY_REBUILD", ["SELECT no_such_function()"]
+    )
+    with Session(engine) as session, pytest.raises(Exception):
+        service.apply_rules(session=session)
+
+    with Session(engine) as session:
+        trigger = session.execute(
+            text(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'trigger' AND name = 'monthlysummary_update'"
+            )
+        ).scalar()
+        assert trigger == "monthlysummary_update"
+        assert session.exec(select(Transaction.category_id)).one() is None
+
+
+def test_apply_rules_ignores_stale_matcher():
+    """Rules applied to stored transactions come from the rules loaded then."""
+    from budy.schemas import CategoryRule
+    from budy.services.category import apply_rules, get_rule_matcher
+    from budy.services.transaction import create_transaction, update_transaction
+
+    reset_db()
+    runner.invoke(app, ["categories", "add", "Food"])
+    with Session(engine) as session:
+        get_rule_matcher(session=session)
+        # Added behind the service's back, so the cached matcher has no rules.
+        session.add(CategoryRule(pattern="pizza", category_id=1))
+        t = create_transaction(session=session, amount=10)
+        update_transaction(session=session, transaction_id=t.id, receiver="Pizza")
+
+        summary = apply_rules(session=session)
+
+        assert summary.changed == 1
+        assert session.exec(select(Transaction.category_id)).one() == 1
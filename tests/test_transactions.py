@@ -135,3 +135,65 @@ def test_delete_transaction(amount):
     with Session(engine) as session:
         deleted_txn = session.get(Transaction, txn_id)
         assert deleted_txn is None
+
+
+def test_list_transactions_keyset_pages():
+    """E2E: Keyset pages walk the whole history without gaps or overlaps."""
+    reset_db()
+    runner = CliRunner()
+
+    with Session(engine) as session:
+        for day in [1, 1, 2, 5, 9]:
+            session.add(Transaction(amount=day * 100, entry_date=date(2020, 1, day)))
+        session.commit()
+
+    result = runner.invoke(app, ["transactions", "list", "-n", "2"])
+    assert result.exit_code == 0
+    assert "Jan 09" in result.stdout and "Jan 05" in result.stdout
+    assert "--before 4" in result.stdout
+    assert "--after" not in result.stdout
+
+    result = runner.invoke(app, ["transactions", "list", "-n", "2", "--before", "4"])
+    assert result.exit_code == 0
+    assert "Jan 02" in result.stdout and "Jan 01" in result.stdout
+    assert "--before 2" in result.stdout
+    assert "--after 3" in result.stdout
+
+    result = runner.invoke(app, ["transactions", "list", "-n", "2", "--before", "2"])
+    assert result.exit_code == 0
+    assert "No more pages" not in result.stdout
+    assert "--before" not in result.stdout
+
+    result = runner.invoke(
+        app, ["transactions", "list", "-n", "10", "--after", "2020-01-02"]
+    )
+    assert result.exit_code == 0
+    assert "Jan 05" in result.stdout and "Jan 09" in result.stdout
+    assert "Jan 02" not in result.stdout
+
+
+def test_list_transactions_sparse():
+    """E2E: Sparse mode omits days without transactions."""
+    reset_db()
+    runner = CliRunner()
+
+    with Session(engine) as session:
+        session.add(Transaction(amount=100, entry_date=date.today()))
+        session.commit()
+
+    result = runner.invoke(app, ["transactions", "list", "--limit", "30", "--sparse"])
+
+    assert result.exit_code == 0
+    assert "Nothing to show" not in result.stdout
+    assert date.today().strftime("%b %d") in result.stdout
+
+
+def test_list_transactions_invalid_cursor():
+    """E2E: Unknown cursors are reported as errors."""
+    reset_db()
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["transactions", "list", "--before", "yesterday"])
+
+    assert result.exit_code == 1
+    assert "Invalid cursor" in result.stdout